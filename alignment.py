@@ -0,0 +1,210 @@
+"""
+Local alignment of edited Thanglish against the original translation.
+
+Smart Sync uses this to find, without any API call, the Tamil and English
+text that belongs to each edited Thanglish line, and which lines no longer
+match what was translated.
+
+The original transcript is cut into spans that correspond across the three
+languages: the translated Whisper segments when segment mode was used,
+otherwise its sentences, paired one to one (or proportionally when the
+sentence counts differ). Edited tokens are aligned to the original ones by
+matching the common prefix and suffix, then anchoring on word trigrams that
+occur once on both sides (patience-style) and repeating inside the gaps.
+This is close to linear in the transcript length.
+"""
+import re
+from bisect import bisect_left
+
+from line_editor import LINE_SEPARATOR, split_lines
+
+TOKEN = re.compile(r"\w+")
+
+# Gaps are re-anchored at most this many times; what remains stays unmatched
+MAX_ALIGN_DEPTH = 8
+
+# Anchors are runs of this many tokens (fewer only where a gap has none);
+# single words repeat too often in speech
+ANCHOR_TOKENS = 3
+
+
+def tokenize(text):
+    return TOKEN.findall(text.casefold())
+
+
+def original_spans(original_translations):
+    """(tanglish, tamil, english) spans of the original transcript that correspond"""
+    segments = original_translations.get('segments')
+    if segments:
+        return [(segment['tanglish'], segment['tamil'], segment['english']) for segment in segments]
+
+    tanglish = split_lines(original_translations.get('tanglish', ""))
+    tamil = split_lines(original_translations.get('tamil', ""))
+    english = split_lines(original_translations.get('english', ""))
+    count = len(tanglish)
+
+    def share(lines, index):
+        return LINE_SEPARATOR.join(lines[index * len(lines) // count:(index + 1) * len(lines) // count])
+
+    return [(line, share(tamil, index), share(english, index)) for index, line in enumerate(tanglish)]
+
+
+def unique_anchors(a, a_lo, a_hi, b, b_lo, b_hi, size=ANCHOR_TOKENS):
+    """
+    (j, i) starts of size-token runs that occur exactly once in a[a_lo:a_hi]
+    and in b[b_lo:b_hi], reduced to the longest chain increasing on both sides.
+    """
+    size = max(min(size, a_hi - a_lo, b_hi - b_lo), 1)
+    in_a = {}
+    for i in range(a_lo, a_hi - size + 1):
+        key = tuple(a[i:i + size])
+        in_a[key] = -1 if key in in_a else i
+    in_b = {}
+    for j in range(b_lo, b_hi - size + 1):
+        key = tuple(b[j:j + size])
+        in_b[key] = -1 if key in in_b else j
+    # Dicts keep first-insertion order, so pairs are already sorted by j
+    pairs = [(j, in_a[token]) for token, j in in_b.items() if j >= 0 and in_a.get(token, -1) >= 0]
+
+    # Longest increasing subsequence on i (patience sorting)
+    tails = []
+    tail_values = []
+    previous = [None] * len(pairs)
+    for index, (_, i) in enumerate(pairs):
+        position = bisect_left(tail_values, i)
+        if position:
+            previous[index] = tails[position - 1]
+        if position == len(tails):
+            tails.append(index)
+            tail_values.append(i)
+        else:
+            tails[position] = index
+            tail_values[position] = i
+
+    chain = []
+    index = tails[-1] if tails else None
+    while index is not None:
+        chain.append(pairs[index])
+        index = previous[index]
+    chain.reverse()
+    return chain
+
+
+def align_tokens(original, edited):
+    """For each edited token, the index of the original token it matches, or -1"""
+    mapping = [-1] * len(edited)
+    stack = [(0, len(original), 0, len(edited), 0)]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi, depth = stack.pop()
+        while a_lo < a_hi and b_lo < b_hi and original[a_lo] == edited[b_lo]:
+            mapping[b_lo] = a_lo
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and original[a_hi - 1] == edited[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            mapping[b_hi] = a_hi
+        if a_lo == a_hi or b_lo == b_hi or depth >= MAX_ALIGN_DEPTH:
+            continue
+
+        # Small or heavily edited gaps may have no unique trigram; try shorter runs
+        size = max(min(ANCHOR_TOKENS, a_hi - a_lo, b_hi - b_lo), 1)
+        anchors = unique_anchors(original, a_lo, a_hi, edited, b_lo, b_hi, size)
+        while not anchors and size > 1:
+            size -= 1
+            anchors = unique_anchors(original, a_lo, a_hi, edited, b_lo, b_hi, size)
+        previous_i, previous_j = a_lo, b_lo
+        for j, i in anchors:
+            # Runs may overlap the previous anchor's; keep only disjoint ones
+            if i < previous_i or j < previous_j:
+                continue
+            stack.append((previous_i, i, previous_j, j, depth + 1))
+            for offset in range(size):
+                mapping[j + offset] = i + offset
+            previous_i, previous_j = i + size, j + size
+        if anchors:
+            stack.append((previous_i, a_hi, previous_j, b_hi, depth + 1))
+    return mapping
+
+
+def align_lines(original_translations, lines):
+    """
+    Map edited Thanglish lines onto the original Tamil and English.
+
+    Lines that share original spans form a group. A group is up to date
+    when its tokens match, in order, exactly the whole spans it covers; its
+    lines are then 'stale' only as a group. Every line gets the text of the
+    spans it overlaps (each span goes to the first line that touches it, so
+    later lines of a group may be left empty) until re-translated.
+
+    Args:
+        original_translations: Job results with tanglish, tamil, english
+                               and optional translated 'segments'
+        lines: (id, text) for every editor line, in order
+
+    Returns:
+        list: {'id', 'tamil', 'english', 'stale', 'group'} per line, in order
+    """
+    spans = original_spans(original_translations)
+    original_tokens = []
+    token_span = []
+    span_sizes = []
+    for index, (tanglish, _, _) in enumerate(spans):
+        tokens = tokenize(tanglish)
+        original_tokens.extend(tokens)
+        token_span.extend([index] * len(tokens))
+        span_sizes.append(len(tokens))
+
+    edited_tokens = []
+    token_line = []
+    for position, (_, text) in enumerate(lines):
+        tokens = tokenize(text)
+        edited_tokens.extend(tokens)
+        token_line.extend([position] * len(tokens))
+
+    mapping = align_tokens(original_tokens, edited_tokens)
+
+    line_spans = [[] for _ in lines]
+    complete = [True] * len(lines)
+    span_lines = {}
+    matched = [0] * len(spans)
+    last_match = [-1] * len(lines)
+    for j, i in enumerate(mapping):
+        position = token_line[j]
+        if i < 0 or i <= last_match[position]:
+            complete[position] = False
+            continue
+        last_match[position] = i
+        span = token_span[i]
+        matched[span] += 1
+        if not line_spans[position] or line_spans[position][-1] != span:
+            line_spans[position].append(span)
+        span_lines.setdefault(span, []).append(position)
+
+    # Matches only move forward, so lines sharing a span are consecutive
+    groups = []
+    for position in range(len(lines)):
+        covered = line_spans[position]
+        if groups and covered and line_spans[groups[-1][-1]] and \
+                line_spans[groups[-1][-1]][-1] == covered[0]:
+            groups[-1].append(position)
+        else:
+            groups.append([position])
+
+    aligned = []
+    for number, group in enumerate(groups):
+        stale = any(
+            not complete[position] or any(matched[span] != span_sizes[span] for span in line_spans[position])
+            for position in group
+        )
+        for position in group:
+            # Each span's text goes to the first line touching it, so nothing is duplicated
+            owned = [span for span in line_spans[position] if span_lines[span][0] == position]
+            aligned.append({
+                'id': lines[position][0],
+                'tamil': " ".join(spans[span][1] for span in owned if spans[span][1]),
+                'english': " ".join(spans[span][2] for span in owned if spans[span][2]),
+                'stale': stale,
+                'group': number
+            })
+    return aligned
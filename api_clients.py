@@ -0,0 +1,174 @@
+"""
+Process-wide API clients.
+
+Each provider client is created once per process and shared by every
+session, job and thread in it. The OpenAI client keeps a bounded pool of
+keep-alive HTTPS connections, so TLS handshakes and client setup happen
+once rather than on every Streamlit rerun or API call. Gemini is configured
+once; its gRPC channel already multiplexes calls over one connection.
+"""
+import threading
+import time
+import weakref
+
+HTTP_POOL_SIZE = 10
+HTTP_KEEPALIVE_SECONDS = 120
+
+
+class CallMetrics:
+    """Thread-safe request counters for one provider"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def record(self, seconds, ok=True):
+        with self.lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.seconds += seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'avg_ms': self.seconds / self.requests * 1000 if self.requests else 0.0
+            }
+
+
+def create_metered_transport(pool_size, metrics):
+    """httpx transport with a bounded keep-alive pool that counts requests and new connections"""
+    import httpx
+
+    class MeteredTransport(httpx.HTTPTransport):
+        def __init__(self):
+            super().__init__(limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS
+            ))
+            self.lock = threading.Lock()
+            self.seen_connections = weakref.WeakSet()
+            self.connections_opened = 0
+
+        def handle_request(self, request):
+            start = time.perf_counter()
+            ok = False
+            try:
+                response = super().handle_request(request)
+                ok = response.status_code < 500
+                return response
+            finally:
+                metrics.record(time.perf_counter() - start, ok)
+                self.count_new_connections()
+
+        def count_new_connections(self):
+            with self.lock:
+                for connection in list(self._pool.connections):
+                    if connection not in self.seen_connections:
+                        self.seen_connections.add(connection)
+                        self.connections_opened += 1
+
+        def pool_state(self):
+            connections = list(self._pool.connections)
+            return {
+                'pool_size': pool_size,
+                'connections_open': len(connections),
+                'connections_idle': sum(1 for connection in connections if connection.is_idle()),
+                'connections_opened': self.connections_opened
+            }
+
+    return MeteredTransport()
+
+
+class MeteredModel:
+    """Wraps a GenerativeModel to time generate_content calls"""
+
+    def __init__(self, model, metrics):
+        self.model = model
+        self.metrics = metrics
+
+    def generate_content(self, *args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.model.generate_content(*args, **kwargs)
+            ok = True
+            return response
+        finally:
+            self.metrics.record(time.perf_counter() - start, ok)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class ClientPool:
+    """
+    Lazily builds one OpenAI client and one Gemini model per process.
+
+    openai_base_url and gemini_endpoint override the provider hosts, e.g.
+    for the local stand-ins in standin_apis.py.
+    """
+
+    def __init__(self, openai_api_key=None, gemini_api_key=None, pool_size=HTTP_POOL_SIZE,
+                 openai_base_url=None, gemini_endpoint=None):
+        self.openai_api_key = openai_api_key
+        self.gemini_api_key = gemini_api_key
+        self.pool_size = pool_size
+        self.openai_base_url = openai_base_url
+        self.gemini_endpoint = gemini_endpoint
+        self.lock = threading.Lock()
+        self.openai_metrics = CallMetrics()
+        self.gemini_metrics = CallMetrics()
+        self._openai_client = None
+        self._transport = None
+        self._generative_model = None
+
+    @property
+    def openai_client(self):
+        with self.lock:
+            if self._openai_client is None:
+                import httpx
+                import openai
+
+                self._transport = create_metered_transport(self.pool_size, self.openai_metrics)
+                # Retries and deadlines belong to call_with_resilience, not the SDK
+                self._openai_client = openai.OpenAI(
+                    api_key=self.openai_api_key,
+                    base_url=self.openai_base_url,
+                    max_retries=0,
+                    http_client=httpx.Client(transport=self._transport, timeout=openai.DEFAULT_TIMEOUT)
+                )
+            return self._openai_client
+
+    @property
+    def generative_model(self):
+        with self.lock:
+            if self._generative_model is None:
+                import google.generativeai as genai
+
+                from translation import GEMINI_MODEL
+
+                if self.gemini_endpoint:
+                    genai.configure(
+                        api_key=self.gemini_api_key,
+                        transport="rest",
+                        client_options={"api_endpoint": self.gemini_endpoint}
+                    )
+                else:
+                    genai.configure(api_key=self.gemini_api_key)
+                self._generative_model = MeteredModel(
+                    genai.GenerativeModel(GEMINI_MODEL), self.gemini_metrics
+                )
+            return self._generative_model
+
+    def metrics(self):
+        """Request counts and latency per provider, plus the OpenAI connection pool state"""
+        openai_metrics = self.openai_metrics.snapshot()
+        if self._transport is not None:
+            openai_metrics.update(self._transport.pool_state())
+        return {'openai': openai_metrics, 'gemini': self.gemini_metrics.snapshot()}
+
@@ -0,0 +1,219 @@
+import io
+import json
+import os
+import subprocess
+import tempfile
+import time
+import wave
+
+# Upload types accepted by the app and the batch CLI
+AUDIO_EXTENSIONS = ["mp3", "wav", "m4a", "ogg", "flac"]
+VIDEO_EXTENSIONS = ["mp4", "mov", "avi", "mkv"]
+SUPPORTED_EXTENSIONS = AUDIO_EXTENSIONS + VIDEO_EXTENSIONS
+
+# Whisper works best with 16kHz mono 16-bit PCM
+TARGET_SAMPLE_RATE = 16000
+TARGET_CHANNELS = 1
+TARGET_SAMPLE_WIDTH = 2
+BYTES_PER_SECOND = TARGET_SAMPLE_RATE * TARGET_CHANNELS * TARGET_SAMPLE_WIDTH
+
+# Size of each PCM read from ffmpeg (~2 seconds of audio)
+READ_CHUNK_BYTES = 64 * 1024
+
+# Transport encodings accepted by Whisper, with rough size per second of
+# 16kHz mono speech used to pick one before encoding
+TRANSPORT_FORMATS = {
+    'wav': {
+        'suffix': '.wav',
+        'args': ["-f", "wav", "-acodec", "pcm_s16le"],
+        'bytes_per_second': BYTES_PER_SECOND
+    },
+    'flac': {
+        'suffix': '.flac',
+        'args': ["-f", "flac", "-compression_level", "5"],
+        'bytes_per_second': BYTES_PER_SECOND * 0.6
+    },
+    'opus': {
+        'suffix': '.ogg',
+        'args': ["-f", "ogg", "-acodec", "libopus", "-b:a", "32k", "-application", "voip"],
+        'bytes_per_second': 32000 / 8
+    }
+}
+
+# Lossless first; Opus only when FLAC would not fit in one request
+AUTO_TRANSPORT_ORDER = ['flac', 'opus']
+
+# Throttle progress callbacks so UI updates don't dominate extraction time
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+
+def probe_media(input_path):
+    """
+    Read duration and stream details from container headers with ffprobe,
+    without decoding any audio.
+
+    Returns:
+        dict: duration_ms, format, audio_codec, sample_rate, channels,
+              video_codec and has_video; None if the file can't be probed
+    """
+    command = [
+        "ffprobe", "-v", "error",
+        "-show_entries",
+        "format=duration,format_name:stream=codec_type,codec_name,sample_rate,channels,duration",
+        "-of", "json", input_path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, check=True, timeout=30)
+        probe = json.loads(result.stdout)
+    except Exception:
+        return None
+
+    streams = probe.get('streams', [])
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+
+    # Container duration is the most reliable; some formats only set it per stream
+    duration = probe.get('format', {}).get('duration') or audio.get('duration')
+    duration_ms = int(float(duration) * 1000) if duration else None
+
+    return {
+        'duration_ms': duration_ms,
+        'format': probe.get('format', {}).get('format_name', ''),
+        'audio_codec': audio.get('codec_name'),
+        'sample_rate': int(audio['sample_rate']) if audio.get('sample_rate') else None,
+        'channels': audio.get('channels'),
+        'video_codec': video.get('codec_name'),
+        'has_video': bool(video)
+    }
+
+
+def probe_media_bytes(content, suffix=""):
+    """Probe uploaded bytes by spilling them to a temporary file"""
+    temp_file_path = None
+    try:
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            temp_file.write(content)
+            temp_file_path = temp_file.name
+        return probe_media(temp_file_path)
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+
+def estimated_wav_bytes(duration_ms):
+    """Size of the 16kHz mono WAV that extraction will produce"""
+    return int(duration_ms * BYTES_PER_SECOND / 1000)
+
+
+def extract_audio_stream(input_path, output, progress_callback=None, duration_ms=None):
+    """
+    Decode any audio/video file to 16kHz mono WAV with ffmpeg, streaming the
+    PCM output in fixed-size reads so memory stays flat for long inputs.
+
+    Args:
+        input_path: Path to the uploaded media file
+        output: Writable binary file object for the WAV data
+        progress_callback: Optional fn(processed_seconds, fraction) called periodically
+        duration_ms: Optional known input duration, used to compute fraction
+
+    Returns:
+        float: Seconds of audio extracted
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", input_path,
+        "-vn", "-ac", str(TARGET_CHANNELS), "-ar", str(TARGET_SAMPLE_RATE),
+        "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1"
+    ]
+
+    # ffmpeg errors are short at this log level, so a temp file avoids pipe deadlocks
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+        processed_bytes = 0
+        last_report = 0.0
+
+        with wave.open(output, "wb") as wav_file:
+            wav_file.setnchannels(TARGET_CHANNELS)
+            wav_file.setsampwidth(TARGET_SAMPLE_WIDTH)
+            wav_file.setframerate(TARGET_SAMPLE_RATE)
+
+            try:
+                while True:
+                    pcm = process.stdout.read(READ_CHUNK_BYTES)
+                    if not pcm:
+                        break
+                    wav_file.writeframes(pcm)
+                    processed_bytes += len(pcm)
+
+                    now = time.monotonic()
+                    if progress_callback and now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                        last_report = now
+                        processed_seconds = processed_bytes / BYTES_PER_SECOND
+                        fraction = None
+                        if duration_ms:
+                            fraction = min(processed_seconds * 1000 / duration_ms, 1.0)
+                        progress_callback(processed_seconds, fraction)
+            finally:
+                process.stdout.close()
+                return_code = process.wait()
+
+        if return_code != 0:
+            stderr_file.seek(0)
+            message = stderr_file.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed: {message or f'exit code {return_code}'}")
+
+    return processed_bytes / BYTES_PER_SECOND
+
+
+def process_video_to_audio(video_content, progress_callback=None, duration_ms=None):
+    """Extract Whisper-ready WAV audio from uploaded audio or video bytes"""
+    temp_file_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(video_content)
+            temp_file_path = temp_file.name
+
+        # ffmpeg needs a seekable input for MP4/MOV files with the index at the end
+        buffer = io.BytesIO()
+        extract_audio_stream(temp_file_path, buffer, progress_callback, duration_ms)
+        return buffer.getvalue(), True
+    except Exception:
+        return None, False
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+
+def choose_transport_format(duration_ms, max_bytes, preference="auto"):
+    """
+    Pick the upload encoding for Whisper.
+
+    An explicit preference is returned as-is. "auto" picks the first format
+    in AUTO_TRANSPORT_ORDER whose estimated size fits under max_bytes, and
+    falls back to the smallest one (the caller chunks it if still too big).
+    """
+    if preference != "auto":
+        return preference
+    if duration_ms:
+        for name in AUTO_TRANSPORT_ORDER:
+            if TRANSPORT_FORMATS[name]['bytes_per_second'] * duration_ms / 1000 <= max_bytes:
+                return name
+    return AUTO_TRANSPORT_ORDER[-1]
+
+
+def encode_for_transport(wav_content, format_name):
+    """Re-encode 16kHz mono WAV bytes into the given transport format"""
+    if format_name == 'wav':
+        return wav_content
+
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-f", "wav", "-i", "pipe:0",
+        "-ac", str(TARGET_CHANNELS), "-ar", str(TARGET_SAMPLE_RATE),
+        *TRANSPORT_FORMATS[format_name]['args'], "pipe:1"
+    ]
+    result = subprocess.run(command, input=wav_content, capture_output=True)
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg {format_name} encode failed: {message}")
+    return result.stdout
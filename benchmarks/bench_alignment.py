@@ -0,0 +1,85 @@
+"""
+Benchmark Smart Sync alignment of an edited transcript against its original.
+
+Usage:
+    python -m benchmarks.bench_alignment [--sizes 10000 100000] [--edit-rate 0.02] [--repeat 3]
+"""
+import argparse
+import random
+
+from alignment import align_lines, align_tokens, tokenize
+from benchmarks.bench_srt import SAMPLE_WORDS, best_time
+from line_editor import LINE_SEPARATOR
+
+# Distinct words in the synthetic speech; frequent ones repeat a lot, as in real speech
+VOCABULARY_SIZE = 3000
+
+
+def synthetic_lines(word_count, seed=0):
+    """Sentences of 4-12 words drawn from a Zipf-like vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = [f"{rng.choice(SAMPLE_WORDS).strip('.')}{index}" for index in range(VOCABULARY_SIZE)]
+    weights = [1 / rank for rank in range(1, VOCABULARY_SIZE + 1)]
+    words = rng.choices(vocabulary, weights, k=word_count)
+    lines = []
+    while words:
+        length = rng.randint(4, 12)
+        lines.append(" ".join(words[:length]))
+        del words[:length]
+    return lines
+
+
+def edited_lines(lines, edit_rate, seed=0):
+    """Lines with about edit_rate of them reworded, split in two or merged with the next"""
+    rng = random.Random(seed)
+    edited = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        roll = rng.random()
+        words = line.split()
+        if roll < edit_rate / 3:
+            words[rng.randrange(len(words))] = "maathiten"
+            edited.append(" ".join(words))
+        elif roll < edit_rate * 2 / 3 and len(words) > 1:
+            middle = len(words) // 2
+            edited.extend([" ".join(words[:middle]), " ".join(words[middle:])])
+        elif roll < edit_rate and index + 1 < len(lines):
+            index += 1
+            edited.append(line + " " + lines[index])
+        else:
+            edited.append(line)
+        index += 1
+    return edited
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="Transcript lengths in words")
+    parser.add_argument("--edit-rate", type=float, default=0.02, help="Share of lines edited")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{'tokens':>9} {'lines':>7} {'tokens (s)':>11} {'unmatched':>10} {'lines (s)':>10} {'stale':>7}")
+    for size in args.sizes:
+        lines = synthetic_lines(size)
+        text = LINE_SEPARATOR.join(lines)
+        original = {'tanglish': text, 'tamil': text, 'english': text}
+        edited = list(enumerate(edited_lines(lines, args.edit_rate), start=1))
+
+        original_tokens = tokenize(text)
+        edited_tokens = tokenize(LINE_SEPARATOR.join(line for _, line in edited))
+        mapping = align_tokens(original_tokens, edited_tokens)
+        token_seconds = best_time(lambda: align_tokens(original_tokens, edited_tokens), args.repeat)
+
+        aligned = align_lines(original, edited)
+        line_seconds = best_time(lambda: align_lines(original, edited), args.repeat)
+
+        print(f"{len(original_tokens):>9,} {len(lines):>7,} {token_seconds:>11.3f} "
+              f"{mapping.count(-1):>10,} {line_seconds:>10.3f} "
+              f"{sum(entry['stale'] for entry in aligned):>7,}")
+
+
+if __name__ == "__main__":
+    main()
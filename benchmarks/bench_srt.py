@@ -0,0 +1,69 @@
+"""
+Benchmark SRT building on long transcripts to check it scales linearly.
+
+Usage:
+    python -m benchmarks.bench_srt [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from subtitles import build_cues, create_full_srt
+
+SAMPLE_WORDS = (
+    "vanakkam nanbargale. inru naam pudhiya thozhilnutpam patri pesalam. "
+    "indha system eppadi velai seigiradhu endru paarkalam. namaku idhu romba mukkiyamana vishayam."
+).split()
+
+# Spoken Tamil averages roughly 150 words per minute
+WORDS_PER_MINUTE = 150
+
+
+def synthetic_transcript(word_count, seed=0):
+    """Words with Whisper-like timings, including occasional pauses"""
+    rng = random.Random(seed)
+    words = [SAMPLE_WORDS[index % len(SAMPLE_WORDS)] for index in range(word_count)]
+    timestamps = []
+    clock = 0.0
+    for word in words:
+        duration = 60 / WORDS_PER_MINUTE * rng.uniform(0.6, 1.2)
+        timestamps.append({'word': word, 'start_time': clock, 'end_time': clock + duration})
+        clock += duration + (rng.uniform(0.8, 1.5) if rng.random() < 0.05 else 0.02)
+    return " ".join(words), timestamps
+
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Transcript lengths in words")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{'words':>9} {'cues':>7} {'SRT (ms)':>10} {'µs/word':>9} {'vs smallest':>12}")
+    baseline = None
+    for size in args.sizes:
+        text, timestamps = synthetic_transcript(size)
+        cue_count = len(build_cues(text, timestamps, min_duration=1.0))
+        seconds = best_time(
+            lambda: create_full_srt(text, timestamps, max_chars=42, max_lines=2, min_duration=1.0),
+            args.repeat
+        )
+        per_word = seconds / size * 1e6
+        baseline = baseline or per_word
+        print(f"{size:>9,} {cue_count:>7,} {seconds * 1000:>10.1f} {per_word:>9.2f} "
+              f"{per_word / baseline:>11.2f}x")
+    print("Linear scaling keeps µs/word roughly flat as the transcript grows.")
+
+
+if __name__ == "__main__":
+    main()
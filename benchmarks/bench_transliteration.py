@@ -0,0 +1,105 @@
+"""
+Benchmark the local Thanglish engine against the Gemini Thanglish prompt.
+
+Usage:
+    python -m benchmarks.bench_transliteration [--text tamil.txt] [--minutes 60]
+    GEMINI_API_KEY=... python -m benchmarks.bench_transliteration --gemini
+"""
+import argparse
+import difflib
+import os
+import re
+import time
+
+from transliteration import transliterate, transliterate_word
+
+SAMPLE_TEXT = (
+    "வணக்கம் நண்பர்களே. இன்று நாம் புதிய தொழில்நுட்பம் பற்றி பேசலாம். "
+    "இந்த சிஸ்டம் எப்படி வேலை செய்கிறது என்று பார்க்கலாம். "
+    "நமக்கு இது மிகவும் முக்கியமான விஷயம். உங்களுக்கு ஏதாவது கேள்வி இருக்கு என்றால் "
+    "கமெண்ட் பண்ணுங்கள். இந்த நிறுவனம் பல நாடுகள் கிட்ட வேலை செய்கிறது. "
+    "அது நம்முடைய பொறுப்பு. அடுத்த வீடியோவில் சந்திக்கலாம்."
+)
+
+# Spoken Tamil averages roughly 150 words per minute
+WORDS_PER_MINUTE = 150
+
+
+def scaled_text(base_text, minutes):
+    words = base_text.split()
+    target = minutes * WORDS_PER_MINUTE
+    repeats = -(-target // len(words))
+    return " ".join((words * repeats)[:target])
+
+
+def comparable_words(text):
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+
+def agreement_rate(local_text, reference_text):
+    """Share of words that line up between the two outputs"""
+    matcher = difflib.SequenceMatcher(
+        None, comparable_words(local_text), comparable_words(reference_text), autojunk=False
+    )
+    return matcher.ratio()
+
+
+def run_gemini(tamil_text):
+    import google.generativeai as genai
+
+    from translation import GEMINI_MODEL, TANGLISH_PROMPT
+
+    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    start = time.perf_counter()
+    response = model.generate_content(TANGLISH_PROMPT.format(tamil_text=tamil_text))
+    return response.text.strip(), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--text", help="UTF-8 file of Tamil transcript text (default: built-in sample)")
+    parser.add_argument("--minutes", type=int, default=60,
+                        help="Transcript length to simulate for the local speed test")
+    parser.add_argument("--gemini", action="store_true",
+                        help="Also run the Gemini prompt on the base text and compare outputs")
+    args = parser.parse_args()
+
+    base_text = SAMPLE_TEXT
+    if args.text:
+        with open(args.text, encoding="utf-8") as text_file:
+            base_text = text_file.read()
+
+    long_text = scaled_text(base_text, args.minutes)
+    word_count = len(long_text.split())
+
+    # Cold run clears the per-word memo so the first pass pays full rule cost
+    transliterate_word.cache_clear()
+    start = time.perf_counter()
+    transliterate(long_text)
+    cold_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transliterate(long_text)
+    warm_seconds = time.perf_counter() - start
+
+    print(f"Local engine: {word_count:,} words (~{args.minutes} min of speech)")
+    print(f"  cold: {cold_seconds * 1000:.1f} ms | warm: {warm_seconds * 1000:.1f} ms | "
+          f"{word_count / cold_seconds:,.0f} words/s")
+
+    if args.gemini:
+        local_output = transliterate(base_text)
+        gemini_output, gemini_seconds = run_gemini(base_text)
+        local_start = time.perf_counter()
+        transliterate(base_text)
+        local_seconds = time.perf_counter() - local_start
+        print(f"Gemini vs local on {len(base_text.split())} words:")
+        print(f"  gemini: {gemini_seconds * 1000:.0f} ms | local: {local_seconds * 1000:.2f} ms | "
+              f"speedup: {gemini_seconds / max(local_seconds, 1e-9):,.0f}x")
+        print(f"  word agreement: {agreement_rate(local_output, gemini_output):.1%}")
+        print(f"  local:  {local_output}")
+        print(f"  gemini: {gemini_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare Whisper upload encodings: encode time vs. bytes saved over WAV.
+
+Usage:
+    python -m benchmarks.bench_transport_encoding path/to/media.mp4 [--uplink-mbps 10]
+"""
+import argparse
+import time
+
+from audio_processing import (
+    TRANSPORT_FORMATS,
+    encode_for_transport,
+    process_video_to_audio,
+)
+
+
+def run_benchmark(media_path, uplink_mbps, repeats):
+    with open(media_path, "rb") as media_file:
+        wav_content, success = process_video_to_audio(media_file.read())
+    if not success:
+        raise SystemExit(f"Could not extract audio from {media_path}")
+
+    wav_bytes = len(wav_content)
+    uplink_bytes_per_second = uplink_mbps * 1_000_000 / 8
+    print(f"Source: {media_path} | WAV payload: {wav_bytes / (1024 * 1024):.2f} MB | "
+          f"Uplink: {uplink_mbps} Mbps")
+    print(f"{'format':<8}{'encode s':>10}{'size MB':>10}{'saved':>9}{'upload s':>10}{'total s':>10}")
+
+    for format_name in TRANSPORT_FORMATS:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            encoded = encode_for_transport(wav_content, format_name)
+            timings.append(time.perf_counter() - start)
+
+        encode_seconds = min(timings)
+        upload_seconds = len(encoded) / uplink_bytes_per_second
+        saved = 1 - len(encoded) / wav_bytes
+        print(f"{format_name:<8}{encode_seconds:>10.2f}{len(encoded) / (1024 * 1024):>10.2f}"
+              f"{saved:>9.0%}{upload_seconds:>10.2f}{encode_seconds + upload_seconds:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("media_path", help="Audio or video file to extract and encode")
+    parser.add_argument("--uplink-mbps", type=float, default=10.0,
+                        help="Uplink bandwidth used to estimate upload time")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Encode runs per format; the fastest is reported")
+    args = parser.parse_args()
+    run_benchmark(args.media_path, args.uplink_mbps, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark word timing memory and encoded size: list of dicts against WordTimeline.
+
+Usage:
+    python -m benchmarks.bench_word_timeline [--sizes 9000 100000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.bench_srt import synthetic_transcript
+from word_timeline import WordTimeline
+
+
+def allocated_bytes(build):
+    """Bytes still held by what build() returns"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return value, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9000, 100000],
+                        help="Transcript lengths in words (~9,000 is an hour of speech)")
+    args = parser.parse_args()
+
+    print(f"{'words':>9} {'dicts (KB)':>11} {'timeline (KB)':>14} {'dicts JSON (KB)':>16} "
+          f"{'encoded (KB)':>13} {'decode (ms)':>12}")
+    for size in args.sizes:
+        _, timestamps = synthetic_transcript(size)
+        encoded_dicts = json.dumps(timestamps)
+        _, dict_bytes = allocated_bytes(lambda: json.loads(encoded_dicts))
+
+        encoded = json.dumps(WordTimeline.from_dicts(timestamps).encode())
+        _, timeline_bytes = allocated_bytes(lambda: WordTimeline.decode(json.loads(encoded)))
+
+        start = time.perf_counter()
+        WordTimeline.decode(json.loads(encoded))
+        decode_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>9,} {dict_bytes / 1024:>11,.0f} {timeline_bytes / 1024:>14,.0f} "
+              f"{len(encoded_dicts) / 1024:>16,.0f} {len(encoded) / 1024:>13,.0f} {decode_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import hashlib
+import json
+
+import transliteration
+from transcription import WHISPER_MODEL
+from translation import ENGLISH_PROMPT, GEMINI_MODEL, SEGMENT_ENGLISH_PROMPT, SEGMENT_PROMPT, TANGLISH_PROMPT
+
+# Bump when the shape or content of cached results changes so old entries are ignored
+CACHE_KEY_VERSION = 5
+
+# Upload bytes hashed per read
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path):
+    with open(path, "rb") as source:
+        return hashlib.blake2b(source.read(), digest_size=8).hexdigest()
+
+
+# The local Thanglish backend's rules, exceptions and code; any edit changes local-backend keys
+TRANSLITERATION_DIGEST = file_digest(transliteration.__file__)
+
+
+def hash_bytes(content, chunk_size=HASH_CHUNK_BYTES):
+    """BLAKE2b hex digest of a bytes-like object, fed in chunks without copying it"""
+    digest = hashlib.blake2b(digest_size=20)
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        digest.update(view[start:start + chunk_size])
+    return digest.hexdigest()
+
+
+def read_and_hash(file_obj, chunk_size=HASH_CHUNK_BYTES):
+    """
+    Get an upload's bytes and their hash. In-memory uploads (Streamlit's
+    UploadedFile, BytesIO) hand over their existing buffer; files on disk
+    are read once.
+
+    Returns:
+        tuple: (content bytes, BLAKE2b hex digest)
+    """
+    if hasattr(file_obj, 'getvalue'):
+        content = file_obj.getvalue()
+    else:
+        file_obj.seek(0)
+        content = file_obj.read()
+    return content, hash_bytes(content, chunk_size)
+
+
+def pipeline_fingerprint(language, transport, translation_mode="auto", translation_memory=True,
+                         tanglish_backend="gemini"):
+    """Short digest of every setting that changes what the pipeline produces"""
+    config = {
+        'language': language,
+        'transport': transport,
+        'translation_mode': translation_mode,
+        'translation_memory': translation_memory,
+        'tanglish_backend': tanglish_backend,
+        'transliteration': TRANSLITERATION_DIGEST if tanglish_backend == "local" else None,
+        'whisper_model': WHISPER_MODEL,
+        'gemini_model': GEMINI_MODEL,
+        'tanglish_prompt': TANGLISH_PROMPT,
+        'english_prompt': ENGLISH_PROMPT,
+        'segment_prompt': SEGMENT_PROMPT,
+        'segment_english_prompt': SEGMENT_ENGLISH_PROMPT
+    }
+    encoded = json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def make_cache_key(content_hash, fingerprint):
+    return f"v{CACHE_KEY_VERSION}-{content_hash}-{fingerprint}"
@@ -0,0 +1,226 @@
+"""
+Headless batch mode: process a directory (or manifest) of media files
+without the Streamlit UI.
+
+    python -m cli ./episodes --output-dir ./captions --workers 4
+
+Each file runs through the same pipeline as the app (audio extraction,
+Whisper, translation) in a process pool, and gets a TXT and an SRT (or any
+--formats) per language under <output-dir>/<file name>/. Files already in the result cache
+are written straight from it without any API calls. API keys and cache
+settings come from the same environment variables as the job worker.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from audio_processing import SUPPORTED_EXTENSIONS, probe_media
+from cache_keys import read_and_hash
+from pipeline import DEFAULT_SETTINGS, SETTING_CHOICES, run_pipeline
+from result_cache import DEFAULT_CACHE_DIR
+from subtitles import SUBTITLE_FORMATS, build_cues, write_subtitles
+
+LANGUAGES = ['tamil', 'tanglish', 'english']
+OUTPUT_FORMATS = ['txt'] + list(SUBTITLE_FORMATS)
+DEFAULT_FORMATS = ['txt', 'srt']
+CLI_MAX_WORKERS = 2
+
+# Per-process pipeline resources, built once by the pool initializer
+_resources = {}
+
+
+def find_media_files(source):
+    """
+    List the media files to process.
+
+    source is a directory (searched recursively), a .json manifest holding a
+    list of paths, or a text manifest with one path per line. Manifest paths
+    are relative to the manifest's directory.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().rsplit('.', 1)[-1] in SUPPORTED_EXTENSIONS:
+                    paths.append(os.path.join(root, name))
+        return paths
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as manifest:
+        if source.lower().endswith(".json"):
+            entries = json.load(manifest)
+        else:
+            entries = [line.strip() for line in manifest]
+    return [
+        os.path.join(base, entry) for entry in entries
+        if entry and not entry.startswith("#")
+    ]
+
+
+def output_name(path, source):
+    """Output folder name for a file, keeping subdirectories of the source apart"""
+    root = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+    if relative.startswith(".."):
+        relative = os.path.basename(path)
+    return os.path.splitext(relative)[0]
+
+
+def write_outputs(results, directory, stem, languages, formats):
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for language in languages:
+        text = results.get(language, "")
+        # One cue timeline per language, shared by every subtitle format
+        cues = None
+        for output_format in formats:
+            path = os.path.join(directory, f"{stem}.{language}.{output_format}")
+            with open(path, "w", encoding="utf-8") as output_file:
+                if output_format == 'txt':
+                    output_file.write(text)
+                else:
+                    if cues is None:
+                        cues = build_cues(text, results.get('timestamps', []))
+                    write_subtitles(cues, output_format, output_file, language)
+            written.append(path)
+    return written
+
+
+def init_worker(cache_dir):
+    from jobs import load_pipeline_resources
+
+    client_pool, _resources['result_cache'], _resources['translation_memory'] = load_pipeline_resources(cache_dir)
+    _resources['openai_client'] = client_pool.openai_client
+    _resources['generative_model'] = client_pool.generative_model
+
+
+def process_file(path, name, output_dir, settings, languages, formats):
+    """
+    Run one file through the pipeline in a pool worker.
+
+    Returns:
+        dict: path, status ("processed", "cached" or "failed"), duration_ms,
+              seconds, outputs and error
+    """
+    start = time.perf_counter()
+    summary = {'path': path, 'status': 'failed', 'duration_ms': 0, 'outputs': [], 'error': None}
+    try:
+        media_info = probe_media(path) or {}
+        summary['duration_ms'] = media_info.get('duration_ms') or 0
+
+        with open(path, "rb") as media_file:
+            content, content_hash = read_and_hash(media_file)
+
+        result = run_pipeline(
+            content, content_hash, settings,
+            _resources['openai_client'], _resources['generative_model'], _resources['result_cache'],
+            _resources['translation_memory'] if settings['use_translation_memory'] else None,
+            duration_ms=media_info.get('duration_ms')
+        )
+        if result['success']:
+            summary['status'] = 'cached' if result['from_cache'] else 'processed'
+            summary['outputs'] = write_outputs(
+                result['results'], os.path.join(output_dir, name),
+                os.path.basename(name), languages, formats
+            )
+        else:
+            summary['error'] = f"{result['stage']}: {result['error']}"
+    except Exception as e:
+        summary['error'] = str(e)
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def run_batch(paths, source, output_dir, settings, languages, formats, workers, cache_dir):
+    """Process every file and return (per-file summaries, wall-clock seconds)"""
+    summaries = []
+    start = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_dir,))
+    try:
+        futures = [
+            executor.submit(
+                process_file, path, output_name(path, source), output_dir, settings, languages, formats
+            )
+            for path in paths
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            summary = future.result()
+            summaries.append(summary)
+            detail = summary['error'] if summary['status'] == 'failed' else f"{summary['seconds']:.1f}s"
+            print(f"[{done}/{len(paths)}] {summary['status']:<9} {summary['path']} ({detail})", flush=True)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return summaries, time.perf_counter() - start
+
+
+def print_summary(summaries, elapsed):
+    counts = {status: 0 for status in ('processed', 'cached', 'failed')}
+    for summary in summaries:
+        counts[summary['status']] += 1
+    completed = [summary for summary in summaries if summary['status'] != 'failed']
+    audio_seconds = sum(summary['duration_ms'] for summary in completed) / 1000
+
+    print()
+    print(f"Files:      {len(summaries)} ({counts['processed']} processed, "
+          f"{counts['cached']} from cache, {counts['failed']} failed)")
+    print(f"Audio:      {audio_seconds / 3600:.2f} h")
+    print(f"Wall time:  {elapsed:.1f} s")
+    if elapsed > 0:
+        print(f"Throughput: {len(completed) / (elapsed / 60):.2f} files/min, "
+              f"{audio_seconds / elapsed:.2f} audio hours/hour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Tamil/Thanglish/English captions for a batch of files")
+    parser.add_argument("source", help="Directory of media files, or a .txt/.json manifest of paths")
+    parser.add_argument("--output-dir", default="captions")
+    parser.add_argument("--workers", type=int, default=CLI_MAX_WORKERS,
+                        help="Files processed in parallel")
+    parser.add_argument("--languages", nargs="+", choices=LANGUAGES, default=LANGUAGES)
+    parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=DEFAULT_FORMATS)
+    parser.add_argument("--cache-dir", default=os.environ.get("THANGLISH_CACHE_DIR", DEFAULT_CACHE_DIR))
+    parser.add_argument("--language", default=DEFAULT_SETTINGS['language'],
+                        help="Whisper language code (default: ta)")
+    parser.add_argument("--transport", choices=SETTING_CHOICES['transport'],
+                        default=DEFAULT_SETTINGS['transport'])
+    parser.add_argument("--translation-mode", choices=SETTING_CHOICES['translation_mode'],
+                        default=DEFAULT_SETTINGS['translation_mode'])
+    parser.add_argument("--tanglish-backend", choices=SETTING_CHOICES['tanglish_backend'],
+                        default=DEFAULT_SETTINGS['tanglish_backend'])
+    parser.add_argument("--no-translation-memory", action="store_true")
+    args = parser.parse_args()
+
+    for key in ("OPENAI_API_KEY", "GEMINI_API_KEY"):
+        if not os.environ.get(key):
+            parser.error(f"{key} is not set")
+
+    # Pool workers are separate processes, so they share rate limits through the cache directory
+    os.environ.setdefault("THANGLISH_RATE_LIMIT_DIR", args.cache_dir)
+
+    paths = find_media_files(args.source)
+    if not paths:
+        print(f"No media files found in {args.source}")
+        return 1
+
+    settings = {
+        'language': args.language,
+        'transport': args.transport,
+        'translation_mode': args.translation_mode,
+        'use_translation_memory': not args.no_translation_memory,
+        'tanglish_backend': args.tanglish_backend
+    }
+    summaries, elapsed = run_batch(
+        paths, args.source, args.output_dir, settings, args.languages, args.formats,
+        max(args.workers, 1), args.cache_dir
+    )
+    print_summary(summaries, elapsed)
+    return 1 if any(summary['status'] == 'failed' for summary in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+ZIP export of several languages and formats in one go.
+
+Cue timelines for the selected languages are built in parallel, one task
+per language, and each format is streamed from its language's timeline
+straight into the archive as soon as that timeline is ready, so no file
+is held in memory as a whole string. manifest.json lists every file with
+its size, SHA-256 and cue count, plus the subtitle settings used.
+"""
+import hashlib
+import json
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from subtitles import SUBTITLE_FORMATS, build_cues
+from word_timeline import load_timeline
+
+BUNDLE_LANGUAGES = ('tanglish', 'tamil', 'english')
+BUNDLE_FORMATS = ('txt',) + tuple(SUBTITLE_FORMATS)
+
+# Language spelling used in export file names
+LANGUAGE_FILE_NAMES = {'tanglish': "thanglish", 'tamil': "tamil", 'english': "english"}
+
+MANIFEST_NAME = "manifest.json"
+
+
+def bundle_filename(language, format_name):
+    extension = SUBTITLE_FORMATS[format_name][1] if format_name in SUBTITLE_FORMATS else "txt"
+    return f"thanglish_captions_{LANGUAGE_FILE_NAMES.get(language, language)}.{extension}"
+
+
+class HashingWriter:
+    """Text sink over a binary file that encodes to UTF-8 and tracks size and SHA-256"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.sha256.update(data)
+        self.bytes += len(data)
+        self.raw.write(data)
+
+
+def build_bundle(transcripts, timestamps, output, languages=BUNDLE_LANGUAGES, formats=BUNDLE_FORMATS,
+                 max_chars=42, max_lines=2, min_duration=0.0):
+    """
+    Write every selected language in every selected format to a ZIP.
+
+    Args:
+        transcripts: {language: text}
+        timestamps: Whisper word timings, shared by all languages
+        output: Path or writable binary file object for the archive
+        formats: 'txt' and/or SUBTITLE_FORMATS names
+
+    Returns:
+        dict: The manifest that was written into the archive
+    """
+    subtitle_formats = [format_name for format_name in formats if format_name in SUBTITLE_FORMATS]
+    timeline = load_timeline(timestamps)
+    files = []
+
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+            ThreadPoolExecutor(max_workers=max(len(languages), 1)) as executor:
+        futures = {}
+        if subtitle_formats:
+            futures = {
+                language: executor.submit(
+                    build_cues, transcripts.get(language, ""), timeline, max_chars, max_lines, min_duration
+                )
+                for language in languages
+            }
+
+        # Entries go in a fixed order whichever timeline finishes first
+        for language in languages:
+            cues = futures[language].result() if language in futures else None
+            for format_name in formats:
+                name = bundle_filename(language, format_name)
+                with archive.open(name, "w") as entry:
+                    sink = HashingWriter(entry)
+                    if format_name == 'txt':
+                        sink.write(transcripts.get(language, ""))
+                    else:
+                        for chunk in SUBTITLE_FORMATS[format_name][0](cues, language):
+                            sink.write(chunk)
+                files.append({
+                    'path': name,
+                    'language': language,
+                    'format': format_name,
+                    'bytes': sink.bytes,
+                    'sha256': sink.sha256.hexdigest(),
+                    'cues': None if format_name == 'txt' else len(cues)
+                })
+
+        manifest = {
+            'created_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            'settings': {'max_chars': max_chars, 'max_lines': max_lines, 'min_duration': min_duration},
+            'files': files
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False))
+    return manifest
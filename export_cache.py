@@ -0,0 +1,123 @@
+"""
+Memoized export rendering for Step 4.
+
+Cue timelines and rendered files are kept in a small per-session LRU,
+keyed by a hash of the transcript text plus the job, language, format and
+subtitle settings, so reruns (slider moves, Generate, Download) reuse work
+instead of rebuilding it. The preview is built from just its first few
+cues unless the full timeline is already cached, so it stays cheap on long
+transcripts.
+"""
+import hashlib
+from collections import OrderedDict
+
+from subtitles import SUBTITLE_FORMATS, build_cues, render_subtitles
+
+# Entries (timelines and files) and their rough total size kept per session
+EXPORT_CACHE_ENTRIES = 24
+EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough memory per word of a cue timeline (the per-word timing tuples dominate)
+TIMELINE_BYTES_PER_WORD = 200
+
+PREVIEW_CUES = 3
+
+
+def content_version(text):
+    """Short hash identifying a transcript version"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ExportCache:
+    """
+    LRU of cue timelines and rendered export files.
+
+    source_key identifies the word timings (the job's cache key); settings
+    is (max_chars, max_lines, min_duration).
+    """
+
+    def __init__(self, max_entries=EXPORT_CACHE_ENTRIES, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size):
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.total_bytes += size
+        # The newest entry always stays, even if it alone is over the limit
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries
+                                         or self.total_bytes > self.max_bytes):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def get_or_build(self, key, build, size_of):
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        self.put(key, value, size_of(value))
+        return value
+
+    def timeline_key(self, text, source_key, settings):
+        return ('cues', content_version(text), source_key, tuple(settings))
+
+    def timeline(self, text, timestamps, source_key, settings):
+        """Full cue timeline for a transcript and settings"""
+        return self.get_or_build(
+            self.timeline_key(text, source_key, settings),
+            lambda: build_cues(text, timestamps, *settings),
+            lambda cues: TIMELINE_BYTES_PER_WORD * sum(len(cue['words']) for cue in cues)
+        )
+
+    def preview_cues(self, text, timestamps, source_key, settings, count=PREVIEW_CUES):
+        """
+        The first count cues and the total cue count. Without a cached full
+        timeline only the first cues are built and the total is None.
+        """
+        cues = self.get(self.timeline_key(text, source_key, settings))
+        if cues is not None:
+            return cues[:count], len(cues)
+        return build_cues(text, timestamps, *settings, limit=count), None
+
+    def rendered(self, text, timestamps, source_key, language, format_name, settings):
+        """
+        Export file bytes ('txt' or a SUBTITLE_FORMATS name).
+
+        Returns:
+            tuple: (cache key, UTF-8 bytes); the key fetches the file again with get()
+        """
+        if format_name == 'txt':
+            key = ('file', content_version(text), language, format_name)
+
+            def build():
+                return text.encode("utf-8")
+        else:
+            key = ('file', content_version(text), source_key, language, format_name, tuple(settings))
+
+            def build():
+                cues = self.timeline(text, timestamps, source_key, settings)
+                return render_subtitles(cues, format_name, language).encode("utf-8")
+
+        return key, self.get_or_build(key, build, len)
+
+
+def export_file_details(format_name):
+    """(file extension, MIME type) for 'txt' or a SUBTITLE_FORMATS name"""
+    if format_name == 'txt':
+        return "txt", "text/plain"
+    _, extension, mime_type = SUBTITLE_FORMATS[format_name]
+    return extension, mime_type
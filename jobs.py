@@ -0,0 +1,420 @@
+"""
+Background job runner for the processing pipeline.
+
+The Streamlit app only submits jobs and polls their state. Jobs run in a
+separate worker process (python -m jobs), so they survive UI reruns,
+refreshes and navigation. Job state, uploads, processed audio and results
+are persisted under the job directory.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_JOB_DIR = os.path.join(DEFAULT_CACHE_DIR, "jobs")
+JOB_MAX_WORKERS = 3
+JOB_POLL_SECONDS = 0.5
+JOB_RETENTION_SECONDS = 24 * 3600
+# The worker runs as long as its server, so old jobs are pruned this often
+JOB_PRUNE_SECONDS = 3600
+
+# Progress events are frequent; write at most this often per job
+PROGRESS_WRITE_SECONDS = 0.5
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+POOL_METRICS_FILE = "pool_metrics.json"
+# Result cache stats scan the cache, so they are refreshed less often than the poll
+CACHE_STATS_SECONDS = 10
+
+
+class JobStore:
+    """SQLite-backed job table plus a directory of per-job files"""
+
+    def __init__(self, directory=DEFAULT_JOB_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "jobs.sqlite3")
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    stage TEXT,
+                    message TEXT,
+                    timings TEXT,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def file_path(self, job_id, suffix):
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    def submit(self, content, content_hash, cache_key, settings):
+        """
+        Queue a job and return its id. An identical job that is still queued
+        or running is reused instead of starting a duplicate.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id FROM jobs WHERE cache_key = ? AND status IN (?, ?) "
+                "ORDER BY created_at LIMIT 1",
+                (cache_key, *ACTIVE_STATUSES)
+            ).fetchone()
+        if row:
+            return row['id']
+
+        job_id = uuid.uuid4().hex
+        with open(self.file_path(job_id, "upload"), "wb") as upload_file:
+            upload_file.write(content)
+
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, status, cache_key, content_hash, settings, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, cache_key, content_hash, json.dumps(settings), now, now)
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ('settings', 'timings', 'result'):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def queue_position(self, job_id):
+        """Number of queued jobs created before this one"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < "
+                "(SELECT created_at FROM jobs WHERE id = ?)",
+                (job_id,)
+            ).fetchone()
+        return row[0]
+
+    def claim_next(self):
+        """Atomically move the oldest queued job to running and return its id"""
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = self.conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), row['id'])
+            ).rowcount
+        return row['id'] if claimed else None
+
+    def update(self, job_id, **fields):
+        for field in ('timings', 'result'):
+            if field in fields:
+                fields[field] = json.dumps(fields[field], ensure_ascii=False)
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id)
+            )
+
+    def requeue_running(self):
+        """Jobs left running by a worker that died are queued again"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'queued', progress = 0, updated_at = ? WHERE status = 'running'",
+                (time.time(),)
+            )
+
+    def prune(self, older_than=JOB_RETENTION_SECONDS):
+        """Delete finished jobs and their files once they are older than the retention window"""
+        cutoff = time.time() - older_than
+        with self.lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+            ).fetchall()
+            self.conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+            )
+        for row in rows:
+            for suffix in ("upload", "wav"):
+                path = self.file_path(row['id'], suffix)
+                if os.path.exists(path):
+                    os.unlink(path)
+
+
+def run_job(store, job_id, openai_client, generative_model, result_cache, translation_memory):
+    """Run one claimed job, writing stage progress and the result to the store"""
+    from pipeline import run_pipeline
+    from stages import StageTracker
+
+    job = store.get(job_id)
+    settings = job['settings']
+    last_write = [0.0]
+
+    def write_progress(event):
+        now = time.monotonic()
+        if event['type'] == 'progress' and now - last_write[0] < PROGRESS_WRITE_SECONDS:
+            return
+        last_write[0] = now
+        store.update(
+            job_id,
+            progress=tracker.overall_progress(),
+            stage=event['stage'],
+            message=event['message'],
+            timings=tracker.breakdown()
+        )
+
+    tracker = StageTracker(write_progress)
+    tracker.record('read', settings.get('read_seconds', 0.0))
+
+    upload_path = store.file_path(job_id, "upload")
+    try:
+        with open(upload_path, "rb") as upload_file:
+            content = upload_file.read()
+
+        result = run_pipeline(
+            content, job['content_hash'], settings, openai_client, generative_model,
+            result_cache, translation_memory if settings.get('use_translation_memory', True) else None,
+            tracker, settings.get('duration_ms')
+        )
+    except Exception as e:
+        store.update(job_id, status='failed', result={'success': False, 'stage': None, 'error': str(e)},
+                     timings=tracker.breakdown())
+        return
+
+    if result['success']:
+        if result['from_cache']:
+            # Cache hits play back the original upload, like the inline flow did
+            audio_path = upload_path
+        else:
+            audio_path = store.file_path(job_id, "wav")
+            with open(audio_path, "wb") as audio_file:
+                audio_file.write(result.pop('audio'))
+            os.unlink(upload_path)
+        result['audio_path'] = audio_path
+
+    store.update(
+        job_id,
+        status='done' if result['success'] else 'failed',
+        progress=1.0,
+        result=result,
+        timings=tracker.breakdown()
+    )
+
+
+def acquire_worker_lock(directory):
+    """Hold an exclusive lock so only one worker serves a job directory"""
+    try:
+        import fcntl
+    except ImportError:
+        return True
+    lock_file = open(os.path.join(directory, "worker.lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    # Keep the file object alive for the life of the process
+    acquire_worker_lock.lock_file = lock_file
+    return True
+
+
+def worker_lock_held(directory):
+    """True if a worker, possibly another app's or service's, already serves a job directory"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    path = os.path.join(directory, "worker.lock")
+    if not os.path.exists(path):
+        return False
+    with open(path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return False
+
+
+def load_pipeline_resources(cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Build the API client pool, result cache and translation memory from the
+    environment (OPENAI_API_KEY, GEMINI_API_KEY, optional OPENAI_BASE_URL and
+    GEMINI_API_ENDPOINT, THANGLISH_HTTP_POOL_SIZE, THANGLISH_CACHE_*).
+
+    Returns:
+        tuple: (client_pool, result_cache, translation_memory)
+    """
+    from api_clients import HTTP_POOL_SIZE, ClientPool
+    from result_cache import create_result_cache
+    from translation_memory import TranslationMemory
+
+    # OPENAI_BASE_URL / GEMINI_API_ENDPOINT point the clients at other
+    # servers, e.g. the local stand-ins in standin_apis.py
+    client_pool = ClientPool(
+        openai_api_key=os.environ["OPENAI_API_KEY"],
+        gemini_api_key=os.environ["GEMINI_API_KEY"],
+        pool_size=int(os.environ.get("THANGLISH_HTTP_POOL_SIZE", HTTP_POOL_SIZE)),
+        openai_base_url=os.environ.get("OPENAI_BASE_URL") or None,
+        gemini_endpoint=os.environ.get("GEMINI_API_ENDPOINT") or None
+    )
+    result_cache = create_result_cache(
+        backend=os.environ.get("THANGLISH_CACHE_BACKEND", "sqlite"),
+        directory=cache_dir,
+        max_bytes=int(os.environ.get("THANGLISH_CACHE_MAX_MB", 512)) * 1024 * 1024,
+        ttl_seconds=int(os.environ.get("THANGLISH_CACHE_TTL_HOURS", 24 * 7)) * 3600
+    )
+    translation_memory = TranslationMemory(cache_dir)
+    return client_pool, result_cache, translation_memory
+
+
+def write_pool_metrics(directory, metrics):
+    """Publish the worker's client pool metrics, rate-limit waits and result cache stats for the app and service"""
+    path = os.path.join(directory, POOL_METRICS_FILE)
+    with open(path + ".tmp", "w") as metrics_file:
+        json.dump(metrics, metrics_file)
+    os.replace(path + ".tmp", path)
+
+
+def worker_main(directory=DEFAULT_JOB_DIR, max_workers=JOB_MAX_WORKERS, cache_dir=DEFAULT_CACHE_DIR,
+                parent_pid=None):
+    """Poll the job store and run queued jobs on a thread pool until the parent exits"""
+    store = JobStore(directory)
+    if not acquire_worker_lock(directory):
+        return
+
+    from rate_limit import rate_limit_waits
+
+    client_pool, result_cache, translation_memory = load_pipeline_resources(cache_dir)
+    openai_client = client_pool.openai_client
+    generative_model = client_pool.generative_model
+
+    store.requeue_running()
+
+    running = set()
+    last_metrics = None
+    last_prune = 0.0
+    cache_stats = None
+    last_cache_stats = 0.0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while parent_pid is None or os.getppid() == parent_pid:
+            running = {future for future in running if not future.done()}
+            while len(running) < max_workers:
+                job_id = store.claim_next()
+                if job_id is None:
+                    break
+                running.add(executor.submit(
+                    run_job, store, job_id, openai_client, generative_model,
+                    result_cache, translation_memory
+                ))
+            if time.time() - last_cache_stats >= CACHE_STATS_SECONDS:
+                cache_stats = result_cache.stats()
+                last_cache_stats = time.time()
+            metrics = {
+                **client_pool.metrics(),
+                'rate_limits': {provider: round(wait, 1) for provider, wait in rate_limit_waits().items()},
+                'result_cache': cache_stats
+            }
+            if metrics != last_metrics:
+                write_pool_metrics(directory, metrics)
+                last_metrics = metrics
+            if time.time() - last_prune >= JOB_PRUNE_SECONDS:
+                store.prune()
+                last_prune = time.time()
+            time.sleep(JOB_POLL_SECONDS)
+
+
+class JobRunner:
+    """Submits jobs from the app and keeps a worker process alive to run them"""
+
+    def __init__(self, directory=DEFAULT_JOB_DIR, max_workers=JOB_MAX_WORKERS,
+                 cache_dir=DEFAULT_CACHE_DIR, env=None):
+        self.store = JobStore(directory)
+        self.directory = directory
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.env = {**os.environ, **(env or {})}
+        self.process = None
+        self.lock = threading.Lock()
+
+    def ensure_worker(self):
+        """
+        Start the worker process, or restart it if it has exited. Nothing is
+        started while another process's worker holds the directory's lock;
+        if that worker goes away, the next call starts one here.
+        """
+        with self.lock:
+            if self.process is not None and self.process.poll() is None:
+                return
+            if worker_lock_held(self.directory):
+                return
+            self.process = subprocess.Popen(
+                [
+                    sys.executable, "-m", "jobs",
+                    "--job-dir", self.directory,
+                    "--cache-dir", self.cache_dir,
+                    "--workers", str(self.max_workers),
+                    "--parent-pid", str(os.getpid())
+                ],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env=self.env
+            )
+
+    def submit(self, content, content_hash, cache_key, settings):
+        self.ensure_worker()
+        return self.store.submit(content, content_hash, cache_key, settings)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def queue_position(self, job_id):
+        return self.store.queue_position(job_id)
+
+    def pool_metrics(self):
+        """The worker's latest pool metrics, rate-limit waits and cache stats, or None before it has written any"""
+        try:
+            with open(os.path.join(self.directory, POOL_METRICS_FILE)) as metrics_file:
+                return json.load(metrics_file)
+        except (OSError, ValueError):
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Thanglish background job worker")
+    parser.add_argument("--job-dir", default=DEFAULT_JOB_DIR)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=JOB_MAX_WORKERS)
+    parser.add_argument("--parent-pid", type=int, default=None,
+                        help="Exit when this process is no longer the parent")
+    args = parser.parse_args()
+    worker_main(args.job_dir, args.workers, args.cache_dir, args.parent_pid)
+
+
+if __name__ == "__main__":
+    main()
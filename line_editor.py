@@ -0,0 +1,156 @@
+"""
+Line store behind the Step 3 editor.
+
+The transcript is split into lines once and each line gets a stable id, so
+the editor only renders one page of text inputs at a time and widget keys
+survive paging. Word and character totals are kept up to date per line,
+and the joined transcript is rebuilt only after a line actually changes.
+
+The store also holds each line's Tamil and English, and which lines were
+edited since they were last translated, so re-translation can send only
+those lines and splice the results back into the other transcripts.
+"""
+import itertools
+
+# Lines rendered per editor page
+EDITOR_PAGE_SIZE = 25
+
+# Transcript lines are sentences split on '.' and re-joined with '. '
+LINE_SEPARATOR = ". "
+
+_line_ids = itertools.count(1)
+
+
+def split_lines(text):
+    return [line.strip() for line in text.split('.') if line.strip()]
+
+
+class LineStore:
+    """
+    Transcript lines keyed by stable id, with running word/character totals.
+
+    ids keeps the line order; lines maps id -> text. translations maps id ->
+    {'tamil', 'english'} for lines whose translation is known, and changed
+    holds ids edited since their last translation.
+    """
+
+    def __init__(self, text=""):
+        self.ids = []
+        self.lines = {}
+        self.translations = {}
+        self.changed = set()
+        # (tamil, english) transcripts the translations were last seeded from or rendered to
+        self.synced = None
+        self.word_counts = {}
+        self.words = 0
+        self.characters = 0
+        for line in split_lines(text):
+            line_id = next(_line_ids)
+            self.ids.append(line_id)
+            self.lines[line_id] = line
+            self.word_counts[line_id] = len(line.split())
+            self.words += self.word_counts[line_id]
+            self.characters += len(line)
+        self.characters += len(LINE_SEPARATOR) * max(len(self.ids) - 1, 0)
+        self._text = LINE_SEPARATOR.join(self.lines[line_id] for line_id in self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def set_line(self, line_id, line):
+        """Replace one line's text; returns True if it changed"""
+        old = self.lines[line_id]
+        if line == old:
+            return False
+        word_count = len(line.split())
+        self.words += word_count - self.word_counts[line_id]
+        self.characters += len(line) - len(old)
+        self.word_counts[line_id] = word_count
+        self.lines[line_id] = line
+        self.changed.add(line_id)
+        self._text = None
+        return True
+
+    def text(self):
+        """The joined transcript, rebuilt only after an edit"""
+        if self._text is None:
+            self._text = LINE_SEPARATOR.join(self.lines[line_id] for line_id in self.ids)
+        return self._text
+
+    def page_count(self, page_size=EDITOR_PAGE_SIZE):
+        return max((len(self.ids) + page_size - 1) // page_size, 1)
+
+    def page(self, number, page_size=EDITOR_PAGE_SIZE):
+        """(line number, id, text) for the lines on a 1-based page"""
+        start = (min(max(number, 1), self.page_count(page_size)) - 1) * page_size
+        return [
+            (start + offset + 1, line_id, self.lines[line_id])
+            for offset, line_id in enumerate(self.ids[start:start + page_size])
+        ]
+
+    def items(self):
+        """(id, text) for every line, in order"""
+        return [(line_id, self.lines[line_id]) for line_id in self.ids]
+
+    def seed_translations(self, tamil_text, english_text):
+        """
+        Take per-line translations from whole Tamil and English transcripts.
+
+        They are only usable when both split into as many lines as the
+        Thanglish; otherwise every line counts as untranslated until
+        apply_alignment() fills in the lines that match the original.
+        """
+        tamil_lines = split_lines(tamil_text)
+        english_lines = split_lines(english_text)
+        self.translations = {}
+        if len(tamil_lines) == len(english_lines) == len(self.ids):
+            for line_id, tamil, english in zip(self.ids, tamil_lines, english_lines):
+                self.translations[line_id] = {'tamil': tamil, 'english': english}
+        self.synced = (tamil_text, english_text)
+
+    def pending_ids(self):
+        """Ids of lines edited or never translated, in line order"""
+        return [
+            line_id for line_id in self.ids
+            if line_id in self.changed or line_id not in self.translations
+        ]
+
+    def apply_translations(self, translated):
+        """Store {id: {'tamil', 'english'}} results; those lines are up to date again"""
+        for line_id, entry in translated.items():
+            if line_id in self.lines:
+                self.translations[line_id] = {
+                    'tamil': entry['tamil'].strip().rstrip('.').strip(),
+                    'english': entry['english'].strip().rstrip('.').strip()
+                }
+                self.changed.discard(line_id)
+
+    def translated_texts(self):
+        """(tamil, english) transcripts spliced from the per-line translations"""
+        texts = tuple(
+            LINE_SEPARATOR.join(
+                self.translations[line_id][language]
+                for line_id in self.ids
+                if line_id in self.translations and self.translations[line_id][language]
+            )
+            for language in ('tamil', 'english')
+        )
+        self.synced = texts
+        return texts
+
+    def apply_alignment(self, aligned):
+        """
+        Take Smart Sync results ({'id', 'tamil', 'english', 'stale', 'group'}
+        per line) for every group with a pending line; other lines keep their
+        translations. Returns the 1-based numbers of lines that remain out of date.
+        """
+        pending = set(self.pending_ids())
+        groups = {entry['group'] for entry in aligned if entry['id'] in pending}
+        for entry in aligned:
+            line_id = entry['id']
+            if entry['group'] not in groups:
+                continue
+            self.apply_translations({line_id: entry})
+            if entry['stale']:
+                self.changed.add(line_id)
+        return [number for number, line_id in enumerate(self.ids, start=1) if line_id in self.changed]
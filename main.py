@@ -1,15 +1,24 @@
 import streamlit as st
-import openai
-import google.generativeai as genai
-import json
-from pydub import AudioSegment
 import io
-from datetime import timedelta
-import hashlib
+import json
 import time
-import tempfile
 import os
 
+from alignment import align_lines
+from api_clients import HTTP_POOL_SIZE, ClientPool
+from audio_processing import SUPPORTED_EXTENSIONS, VIDEO_EXTENSIONS, estimated_wav_bytes, probe_media_bytes
+from cache_keys import read_and_hash
+from export_bundle import build_bundle
+from export_cache import PREVIEW_CUES, ExportCache, export_file_details
+from jobs import ACTIVE_STATUSES, JOB_MAX_WORKERS, JOB_POLL_SECONDS, JobRunner
+from line_editor import LineStore
+from pipeline import pipeline_cache_key
+from result_cache import DEFAULT_CACHE_DIR
+from subtitles import render_subtitles
+from transcription import WHISPER_MAX_BYTES
+from translation import retranslate_lines
+from word_timeline import load_timeline
+
 # Page Configuration
 st.set_page_config(
     page_title="Thanglish - Tamil Caption Generator",
@@ -364,220 +373,97 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Authentication and helper functions
+@st.cache_resource
+def load_api_clients():
+    """One client pool per server process, shared by every session and rerun"""
+    return ClientPool(
+        openai_api_key=st.secrets.get("openai_api_key"),
+        gemini_api_key=st.secrets.get("gemini_api_key"),
+        pool_size=int(st.secrets.get("http_pool_size", HTTP_POOL_SIZE))
+    )
+
 def load_openai_client():
-    """Initialize OpenAI client with API key from secrets"""
+    """Shared OpenAI client, with its API key from secrets"""
     try:
         if "openai_api_key" in st.secrets:
-            api_key = st.secrets["openai_api_key"]
-            client = openai.OpenAI(api_key=api_key)
+            client = load_api_clients().openai_client
             return client, "Success"
         else:
             return None, "OpenAI API key not found in secrets"
     except Exception as e:
         return None, f"Error initializing OpenAI client: {str(e)}"
 
-def get_audio_hash(audio_content):
-    return hashlib.md5(audio_content).hexdigest()
-
-def cache_translation_results(audio_hash, results):
-    cache_key = f"cache_{audio_hash}"
-    st.session_state[cache_key] = {
-        'timestamp': time.time(),
-        'results': results
-    }
-
-def get_cached_translations(audio_hash):
-    cache_key = f"cache_{audio_hash}"
-    if cache_key in st.session_state:
-        cached_data = st.session_state[cache_key]
-        if time.time() - cached_data['timestamp'] < 86400:
-            return cached_data['results']
-    return None
+@st.cache_resource
+def load_job_runner():
+    """One background worker per server process; jobs outlive Streamlit reruns"""
+    cache_dir = st.secrets.get("cache_dir", DEFAULT_CACHE_DIR)
+    return JobRunner(
+        directory=os.path.join(cache_dir, "jobs"),
+        max_workers=int(st.secrets.get("job_workers", JOB_MAX_WORKERS)),
+        cache_dir=cache_dir,
+        env={
+            "OPENAI_API_KEY": st.secrets.get("openai_api_key", ""),
+            "GEMINI_API_KEY": st.secrets.get("gemini_api_key", ""),
+            "THANGLISH_CACHE_BACKEND": str(st.secrets.get("cache_backend", "sqlite")),
+            "THANGLISH_CACHE_MAX_MB": str(st.secrets.get("cache_max_mb", 512)),
+            "THANGLISH_CACHE_TTL_HOURS": str(st.secrets.get("cache_ttl_hours", 24 * 7)),
+            "THANGLISH_HTTP_POOL_SIZE": str(st.secrets.get("http_pool_size", HTTP_POOL_SIZE)),
+            "THANGLISH_GEMINI_HEDGE_SECONDS": str(st.secrets.get("gemini_hedge_seconds", "")),
+            "THANGLISH_WHISPER_RPM": str(st.secrets.get("whisper_rpm", "")),
+            "THANGLISH_WHISPER_AUDIO_SECONDS_PER_MIN": str(st.secrets.get("whisper_audio_seconds_per_min", "")),
+            "THANGLISH_GEMINI_RPM": str(st.secrets.get("gemini_rpm", "")),
+            "THANGLISH_GEMINI_TPM": str(st.secrets.get("gemini_tpm", "")),
+            # Share one budget with other processes (CLI, service) using this cache directory
+            "THANGLISH_RATE_LIMIT_DIR": cache_dir if st.secrets.get("shared_rate_limits", False) else ""
+        }
+    )
 
-def process_video_to_audio(video_content):
-    try:
-        video_segment = AudioSegment.from_file(io.BytesIO(video_content))
-        audio_segment = video_segment.set_frame_rate(16000).set_channels(1)
-        buffer = io.BytesIO()
-        audio_segment.export(buffer, format="wav")
-        return buffer.getvalue(), True
-    except Exception as e:
-        return None, False
+def latency_summary(latency):
+    """Per-call translation latency as text; segment batches are summarized"""
+    if len(latency) <= 3:
+        return ", ".join(f"{name.title()} {seconds:.1f}s" for name, seconds in latency.items())
+    seconds = list(latency.values())
+    return (f"{len(seconds)} batches, {sum(seconds) / len(seconds):.1f}s average, "
+            f"{max(seconds):.1f}s slowest")
 
-def transcribe_with_whisper(audio_content, language="ta"):
+def sync_line_store():
     """
-    Transcribe audio using OpenAI Whisper API
-    
-    Args:
-        audio_content: Raw audio bytes
-        language: Language code (ta for Tamil, en for English)
-    
-    Returns:
-        dict: Contains transcript and timestamps if available
+    The editor's LineStore for the current transcripts, with edits from this
+    run's text inputs applied, so the editing tools see the latest lines.
     """
-    try:
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_file.write(audio_content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Open the file for Whisper API
-            with open(temp_file_path, "rb") as audio_file:
-                # Use Whisper API with timestamp feature
-                transcript_response = openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language=language,
-                    response_format="verbose_json",
-                    timestamp_granularities=["word"]
-                )
-            
-            # Extract transcript and word-level timestamps
-            full_transcript = transcript_response.text
-            
-            # Generate word timestamps from segments if available
-            timestamps_data = []
-            if hasattr(transcript_response, 'words') and transcript_response.words:
-                for word_info in transcript_response.words:
-                    timestamps_data.append({
-                        'word': word_info.word,
-                        'start_time': word_info.start,
-                        'end_time': word_info.end
-                    })
-            else:
-                # Fallback: create estimated timestamps
-                words = full_transcript.split()
-                estimated_duration = len(words) * 0.5  # Rough estimate
-                for i, word in enumerate(words):
-                    start_time = i * (estimated_duration / len(words))
-                    end_time = (i + 1) * (estimated_duration / len(words))
-                    timestamps_data.append({
-                        'word': word,
-                        'start_time': start_time,
-                        'end_time': end_time
-                    })
-            
-            return {
-                'transcript': full_transcript,
-                'timestamps': timestamps_data,
-                'success': True
-            }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-    
-    except Exception as e:
-        return {
-            'transcript': "",
-            'timestamps': [],
-            'success': False,
-            'error': str(e)
-        }
-
-def generate_initial_translations(tamil_text):
-    try:
-        # Enhanced prompt for better Tanglish accuracy
-        tanglish_prompt = f"""
-        Convert this Tamil text to highly accurate Thanglish (Tamil written in phonetic English letters) following these strict rules:
-
-        CRITICAL PHONETIC RULES:
-        - க = ka/ga, ச = cha/sa, ட = ta/da, த = tha, ப = pa/ba, ற = ra/rra
-        - ங் = ng, ன் = n, ம் = m, ல் = l, ர் = r, ய் = y, ழ் = zh
-        - ஆ = aa, ஈ = ee, ஊ = oo, ஏ = e, ஐ = ai, ஓ = o, ஔ = au
-        - Double consonants: க்க = kka, ச்ச = chcha, ட்ட = tta, ப்ப = ppa
-        
-        WORD ACCURACY FIXES:
-        - மிசைல் = missile (keep English technical terms)
-        - சிஸ்டம் = system 
-        - மெசேஜ் = message
-        - டெக்னாலஜி = technology
-        - இன்ஜினியர் = engineer
-        - கம்ப்யூட்டர் = computer
-        
-        COMMON WORDS - USE THESE EXACT SPELLINGS:
-        - என்ன = enna, அவன் = avan, இவன் = ivan, அது = adhu, இது = idhu
-        - நமக்கு = namaku, எங்களுக்கு = engaluku, உங்களுக்கு = ungaluku
-        - பண்ணலாம் = pannalam, செய்யலாம் = seiyalam
-        - இருக்கு = iruku, வருகிறேன் = varukiren
-        - கிட்ட = kitta, கூட = kooda, மட்டும் = mattum
-        
-        EXAMPLES OF CORRECT CONVERSION:
-        - நிச்சயமான = nichchayamana 
-        - நாடுகள் = naadugal
-        - தொழில்நுட்பம் = thozhilnutpam
-        - பொறுப்பு = poruppu
-        - நிறுவனம் = niruvanam
-        
-        Text: "{tamil_text}"
-
-        Return ONLY the accurate Thanglish translation with proper phonetic spelling.
-        """
-        
-        tanglish_response = generative_model.generate_content(tanglish_prompt)
-        tanglish_text = tanglish_response.text.strip()
-        
-        english_prompt = f"""
-        Translate this Tamil text to natural, contextually accurate English with perfect grammar.
-
-        TRANSLATION GUIDELINES:
-        - Preserve the original meaning and conversational tone
-        - Use natural English expressions, not literal translations
-        - Maintain technical terms appropriately 
-        - Keep the conversational flow for spoken content
-        - For Tamil cultural references, use equivalent English expressions
-        - Ensure grammatical correctness and natural sentence structure
-
-        Text: "{tamil_text}"
-
-        Return ONLY the natural English translation with proper grammar.
-        """
-        
-        english_response = generative_model.generate_content(english_prompt)
-        english_text = english_response.text.strip()
-        
-        return {
-            'tamil': tamil_text,
-            'tanglish': tanglish_text,
-            'english': english_text
-        }
-    except Exception as e:
-        return {
-            'tamil': tamil_text,
-            'tanglish': f"Translation Error: {e}",
-            'english': f"Translation Error: {e}"
-        }
-
-def smart_text_sync(edited_tanglish, original_translations):
-    if not original_translations:
-        return None, "no_original"
-    
-    original_words = original_translations['tanglish'].split()
-    edited_words = edited_tanglish.split()
-    
-    word_diff_ratio = abs(len(original_words) - len(edited_words)) / max(len(original_words), 1)
-    
-    if word_diff_ratio > 0.3:
-        return None, "major_changes"
-    
-    return {
-        'tamil': original_translations['tamil'],
-        'tanglish': edited_tanglish,
-        'english': original_translations['english']
-    }, "minor_changes"
+    line_store = st.session_state.get('line_store')
+    # Rebuild only when the transcript was replaced outside the editor (new job, reset)
+    if line_store is None or st.session_state.get('line_store_text') != st.session_state.tanglish_transcript:
+        line_store = LineStore(st.session_state.tanglish_transcript)
+        st.session_state.line_store = line_store
+        st.session_state.line_store_text = st.session_state.tanglish_transcript
+    if line_store.synced != (st.session_state.tamil_transcript, st.session_state.english_transcript):
+        line_store.seed_translations(st.session_state.tamil_transcript, st.session_state.english_transcript)
+        # Sentence counts rarely match across languages; recover the other lines locally
+        if line_store.pending_ids() and st.session_state.original_translations:
+            line_store.apply_alignment(align_lines(st.session_state.original_translations, line_store.items()))
+    
+    edited = False
+    for key in [key for key in st.session_state.keys() if key.startswith("editor_line_")]:
+        line_id = int(key[len("editor_line_"):])
+        if line_id in line_store.lines:
+            edited = line_store.set_line(line_id, st.session_state[key]) or edited
+    if edited:
+        st.session_state.tanglish_transcript = line_store.text()
+        st.session_state.line_store_text = st.session_state.tanglish_transcript
+        st.session_state.save_message = ""
+    return line_store
 
 # Initialize Authentication
 openai_client, openai_auth_message = load_openai_client()
 openai_success = openai_client is not None
 
-# Initialize Gemini for translations
+# Initialize Gemini for translations (configured once per process)
 gemini_success = False
+gemini_auth_message = "Gemini API key not found in secrets"
 if "gemini_api_key" in st.secrets:
     try:
-        genai.configure(api_key=st.secrets["gemini_api_key"])
-        generative_model = genai.GenerativeModel("gemini-1.5-flash")
+        generative_model = load_api_clients().generative_model
         gemini_success = True
     except Exception as e:
         gemini_success = False
@@ -593,11 +479,14 @@ if not auth_success:
 else:
     auth_message = "All services initialized successfully"
 
+# Export language names -> result keys (as used by LANGUAGE_TAGS and the job results)
+EXPORT_LANGUAGE_KEYS = {'Thanglish': 'tanglish', 'Tamil': 'tamil', 'English': 'english'}
+
 # Initialize Session State
 session_vars = [
     'current_step', 'audio_hash', 'original_transcript', 'tanglish_transcript', 
     'tamil_transcript', 'english_transcript', 'timestamps', 'editing_mode',
-    'save_message', 'original_translations', 'file_type', 'audio_content'
+    'save_message', 'original_translations', 'file_type', 'audio_content', 'job_id'
 ]
 
 for var in session_vars:
@@ -611,6 +500,16 @@ for var in session_vars:
         else:
             st.session_state[var] = ""
 
+# A refresh starts a new session; pick the job back up from the URL
+if not st.session_state.job_id and st.session_state.current_step == 1 and st.query_params.get("job"):
+    resumed_job = load_job_runner().get(st.query_params["job"])
+    if resumed_job is None:
+        st.query_params.pop("job", None)
+    else:
+        st.session_state.job_id = resumed_job['id']
+        st.session_state.file_type = resumed_job['settings'].get('file_type', "")
+        st.session_state.current_step = 2
+
 # Main App
 st.markdown('<div class="main-container">', unsafe_allow_html=True)
 
@@ -666,7 +565,7 @@ if st.session_state.current_step == 1:
     st.markdown("""
     <div class="info-box">
         💡 <strong>Supported formats:</strong> Audio (MP3, WAV, M4A) and Video (MP4, MOV, AVI)<br>
-        📊 <strong>File limit:</strong> 25MB (Whisper API limit) | ⏱️ <strong>Duration:</strong> Up to 60 minutes
+        📊 <strong>Long files:</strong> Split automatically past 25MB | ⏱️ <strong>Duration:</strong> Up to 60 minutes
     </div>
     """, unsafe_allow_html=True)
     
@@ -699,7 +598,7 @@ if st.session_state.current_step == 1:
     
     uploaded_file = st.file_uploader(
         "Drop your file here or click to browse",
-        type=["mp3", "wav", "m4a", "ogg", "flac", "mp4", "mov", "avi", "mkv"],
+        type=SUPPORTED_EXTENSIONS,
         help="Upload audio or video files for transcription",
         label_visibility="collapsed"
     )
@@ -707,39 +606,42 @@ if st.session_state.current_step == 1:
     if uploaded_file:
         file_extension = uploaded_file.name.lower().split('.')[-1]
         st.session_state.file_type = file_extension
-        is_video = file_extension in ['mp4', 'mov', 'avi', 'mkv']
+        is_video = file_extension in VIDEO_EXTENSIONS
         
         # File info
         file_size = len(uploaded_file.getvalue()) / (1024 * 1024)
         
-        # Check file size limit
-        if file_size > 25:
+        # Probe headers once per upload; reruns reuse the stored result
+        probe_key = f"{uploaded_file.name}:{uploaded_file.size}"
+        if st.session_state.get('media_info_key') != probe_key:
+            st.session_state.media_info = probe_media_bytes(
+                uploaded_file.getvalue(), suffix=f".{file_extension}"
+            )
+            st.session_state.media_info_key = probe_key
+        media_info = st.session_state.media_info
+        
+        if media_info and media_info['duration_ms']:
+            duration_text = f"{media_info['duration_ms'] / (1000 * 60):.1f} minutes"
+            audio_details = f"{media_info['audio_codec'] or 'unknown'} · {media_info['sample_rate'] or '?'} Hz · {media_info['channels'] or '?'} ch"
+        else:
+            duration_text = "Duration calculation unavailable"
+            audio_details = "Unavailable"
+        
+        # Large files are split at silences and transcribed in parallel chunks
+        if media_info and media_info['duration_ms'] and estimated_wav_bytes(media_info['duration_ms']) > WHISPER_MAX_BYTES:
             st.markdown("""
-            <div class="warning-box">
-                ⚠️ <strong>File too large!</strong> OpenAI Whisper has a 25MB limit.<br>
-                💡 <strong>Solutions:</strong><br>
-                • Compress your audio/video file<br>
-                • Use online tools to reduce file size<br>
-                • Split longer recordings into smaller chunks
+            <div class="info-box">
+                ✂️ <strong>Long file detected!</strong> It is over Whisper's 25MB limit, so we'll split it
+                at natural pauses and transcribe the pieces in parallel.
             </div>
             """, unsafe_allow_html=True)
-            st.stop()
-        
-        try:
-            if is_video:
-                duration_text = f"~{file_size / 2:.1f} minutes (estimated)"
-            else:
-                audio_segment = AudioSegment.from_file(uploaded_file)
-                duration_minutes = len(audio_segment) / (1000 * 60)
-                duration_text = f"{duration_minutes:.1f} minutes"
-        except:
-            duration_text = "Duration calculation unavailable"
         
         st.markdown(f"""
         <div class="success-box">
             ✅ <strong>File uploaded:</strong> {uploaded_file.name}<br>
             📁 <strong>Size:</strong> {file_size:.1f} MB | ⏱️ <strong>Duration:</strong> {duration_text}<br>
-            🎯 <strong>Type:</strong> {'Video' if is_video else 'Audio'} file | 🚀 <strong>Powered by:</strong> OpenAI Whisper
+            🎯 <strong>Type:</strong> {'Video' if is_video else 'Audio'} file | 🔊 <strong>Audio:</strong> {audio_details}<br>
+            🚀 <strong>Powered by:</strong> OpenAI Whisper
         </div>
         """, unsafe_allow_html=True)
         
@@ -772,6 +674,45 @@ if st.session_state.current_step == 1:
                     help="Let Whisper automatically detect the language"
                 )
             
+            transport_format = st.selectbox(
+                "Upload Encoding",
+                ["auto", "flac", "opus", "wav"],
+                format_func=lambda x: {
+                    "auto": "Auto (smallest lossless that fits)",
+                    "flac": "FLAC (lossless)",
+                    "opus": "Opus (smallest)",
+                    "wav": "WAV (uncompressed)"
+                }[x],
+                help="How audio is compressed before it is sent to Whisper"
+            )
+            
+            translation_mode = st.selectbox(
+                "Translation Mode",
+                ["auto", "full", "segments"],
+                format_func=lambda x: {
+                    "auto": "Auto (segments for long files)",
+                    "full": "Whole transcript",
+                    "segments": "Segment-aligned (keeps timing per line)"
+                }[x],
+                help="Segment mode translates Whisper segments in parallel batches"
+            )
+            
+            tanglish_backend = st.selectbox(
+                "Thanglish Engine",
+                ["gemini", "local"],
+                format_func=lambda x: {
+                    "gemini": "Gemini AI",
+                    "local": "Local rules (instant, offline)"
+                }[x],
+                help="Local rules apply the same phonetic spellings without an API call"
+            )
+            
+            use_translation_memory = st.checkbox(
+                "Reuse translation memory",
+                value=True,
+                help="Reuse earlier translations of repeated sentences (intros, outros, sponsor reads)"
+            )
+            
             st.markdown("""
             <div class="info-box">
                 🤖 <strong>Whisper Features:</strong><br>
@@ -787,8 +728,18 @@ if st.session_state.current_step == 1:
         with col2:
             if st.button("🚀 Start Processing with Whisper", type="primary", use_container_width=True):
                 # Store file content and settings in session state
-                st.session_state.uploaded_file_content = uploaded_file.getvalue()
+                # Hash while reading so the cache key costs no extra pass over the bytes
+                read_start = time.perf_counter()
+                content, content_hash = read_and_hash(uploaded_file)
+                st.session_state.read_seconds = time.perf_counter() - read_start
+                st.session_state.uploaded_file_content = content
+                st.session_state.content_hash = content_hash
                 st.session_state.selected_language = None if auto_detect else primary_language
+                st.session_state.transport_format = transport_format
+                st.session_state.translation_mode = translation_mode
+                st.session_state.use_translation_memory = use_translation_memory
+                st.session_state.tanglish_backend = tanglish_backend
+                st.session_state.job_id = ""
                 st.session_state.current_step = 2
                 st.rerun()
     
@@ -810,7 +761,7 @@ elif st.session_state.current_step == 2:
         status_text = st.empty()
     
     # Auto-process without asking for file upload again
-    if not hasattr(st.session_state, 'uploaded_file_content'):
+    if not st.session_state.job_id and not hasattr(st.session_state, 'uploaded_file_content'):
         st.error("❌ No file found. Please go back and upload a file.")
         if st.button("← Back to Upload"):
             st.session_state.current_step = 1
@@ -822,126 +773,130 @@ elif st.session_state.current_step == 2:
         st.session_state.editing_mode = False
         st.session_state.save_message = ""
         
-        status_text.info("📁 Reading file...")
-        progress_bar.progress(10)
-        time.sleep(0.5)
-        
-        audio_content = st.session_state.uploaded_file_content
-        audio_hash = get_audio_hash(audio_content)
-        st.session_state.audio_hash = audio_hash
-        
-        status_text.info("🔍 Checking cache...")
-        progress_bar.progress(20)
-        time.sleep(0.5)
-        
-        cached_results = get_cached_translations(audio_hash)
-        
-        if cached_results:
-            status_text.success("⚡ Loading from cache...")
-            progress_bar.progress(100)
-            
-            st.session_state.original_transcript = cached_results['tamil']
-            st.session_state.tamil_transcript = cached_results['tamil']
-            st.session_state.tanglish_transcript = cached_results['tanglish']
-            st.session_state.english_transcript = cached_results['english']
-            st.session_state.timestamps = cached_results.get('timestamps', [])
-            st.session_state.original_translations = cached_results
-            st.session_state.editing_mode = True
-            st.session_state.current_step = 3
-            st.session_state.audio_content = audio_content
-            
-            time.sleep(1)
-            st.rerun()
-        
-        # Process file
         file_extension = st.session_state.file_type
-        is_video = file_extension in ['mp4', 'mov', 'avi', 'mkv']
-        
-        if is_video:
-            status_text.info("🎥 Extracting audio from video...")
-            progress_bar.progress(30)
-            time.sleep(1)
-            
-            processed_audio, success = process_video_to_audio(audio_content)
-            if not success:
-                st.error("❌ Failed to extract audio from video. Please try a different file.")
-                st.stop()
-            content = processed_audio
-        else:
-            status_text.info("🎵 Processing audio for Whisper...")
-            progress_bar.progress(30)
-            time.sleep(1)
-            
-            # Process audio for Whisper (convert to compatible format)
-            audio_segment = AudioSegment.from_file(io.BytesIO(audio_content))
-            audio_segment = audio_segment.set_frame_rate(16000).set_channels(1)
-            buffer = io.BytesIO()
-            audio_segment.export(buffer, format="wav")
-            content = buffer.getvalue()
-        
-        # Store processed audio for playback
-        st.session_state.audio_content = content
+        is_video = file_extension in VIDEO_EXTENSIONS
+        stage_labels = {
+            'read': "📁 Reading file",
+            'hash': "🔑 Building cache key",
+            'cache': "🔍 Checking cache",
+            'extract': "🎥 Extracting audio from video" if is_video else "🎵 Processing audio for Whisper",
+            'transcribe': "🤖 Transcribing with OpenAI Whisper",
+            'translate': "🌍 Generating Thanglish and English translations",
+            'save': "💾 Saving results"
+        }
         
-        status_text.info("🤖 Transcribing with OpenAI Whisper...")
-        progress_bar.progress(50)
-        time.sleep(1)
+        job_runner = load_job_runner()
         
-        # Use Whisper API for transcription
-        selected_language = st.session_state.get('selected_language', None)
-        whisper_result = transcribe_with_whisper(content, selected_language or "ta")
+        # Submit once; later reruns (refresh, navigation, widgets) only poll
+        if not st.session_state.job_id:
+            media_info = st.session_state.get('media_info') or {}
+            settings = {
+                'language': st.session_state.get('selected_language', None),
+                'transport': st.session_state.get('transport_format', 'auto'),
+                'translation_mode': st.session_state.get('translation_mode', 'auto'),
+                'use_translation_memory': st.session_state.get('use_translation_memory', True),
+                'tanglish_backend': st.session_state.get('tanglish_backend', 'gemini'),
+                'duration_ms': media_info.get('duration_ms'),
+                'read_seconds': st.session_state.get('read_seconds', 0.0),
+                'file_type': st.session_state.file_type
+            }
+            content_hash = st.session_state.content_hash
+            st.session_state.job_id = job_runner.submit(
+                st.session_state.uploaded_file_content,
+                content_hash,
+                pipeline_cache_key(content_hash, settings),
+                settings
+            )
+            # Kept in the URL so a browser refresh resumes this job
+            st.query_params["job"] = st.session_state.job_id
         
-        if not whisper_result['success']:
-            st.error(f"❌ Whisper transcription failed: {whisper_result.get('error', 'Unknown error')}")
-            st.markdown("""
-            <div class="warning-box">
-                💡 <strong>Troubleshooting tips:</strong><br>
-                • Check your internet connection<br>
-                • Ensure audio quality is good<br>
-                • Try with a smaller file<br>
-                • Check OpenAI API key and credits
-            </div>
-            """, unsafe_allow_html=True)
+        job = job_runner.get(st.session_state.job_id)
+        if job is None:
+            st.session_state.job_id = ""
+            st.query_params.pop("job", None)
+            st.error("❌ This processing job has expired. Please upload the file again.")
             if st.button("← Back to Upload"):
                 st.session_state.current_step = 1
                 st.rerun()
             st.stop()
         
-        tamil_transcript = whisper_result['transcript']
-        timestamps_data = whisper_result['timestamps']
+        if job['status'] in ACTIVE_STATUSES:
+            job_runner.ensure_worker()
+            progress_bar.progress(int(job['progress'] * 100))
+            if job['status'] == 'queued':
+                ahead = job_runner.queue_position(job['id'])
+                status_text.info(f"⏳ Queued ({ahead} job{'s' if ahead != 1 else ''} ahead)...")
+            else:
+                detail = f" ({job['message']})" if job['message'] else ""
+                status_text.info(f"{stage_labels.get(job['stage'], '🔄 Processing')}...{detail}")
+            rate_limits = (job_runner.pool_metrics() or {}).get('rate_limits') or {}
+            provider = {'transcribe': 'whisper', 'translate': 'gemini'}.get(job['stage'])
+            if provider and rate_limits.get(provider, 0) >= 1:
+                st.caption(f"🚦 {provider.title()} is busy — requests are queued for ~{rate_limits[provider]:.0f}s to stay under the API rate limit.")
+            st.caption("Processing runs in the background — you can refresh or come back to this page.")
+            time.sleep(JOB_POLL_SECONDS * 2)
+            st.rerun()
+        
+        result = job['result']
+        st.session_state.stage_timings = job['timings'] or []
+        st.session_state.translation_latency = (result or {}).get('translation_latency') or {}
         
-        if not tamil_transcript.strip():
-            st.warning("⚠️ Could not transcribe the file. Please check audio quality and try again.")
+        if job['status'] == 'failed':
+            if result.get('stage') == 'extract':
+                if is_video:
+                    st.error("❌ Failed to extract audio from video. Please try a different file.")
+                else:
+                    st.error("❌ Failed to process audio. Please try a different file.")
+            elif result.get('empty'):
+                st.warning("⚠️ Could not transcribe the file. Please check audio quality and try again.")
+            elif result.get('stage') == 'transcribe':
+                st.error(f"❌ Whisper transcription failed: {result['error']}")
+                st.markdown("""
+                <div class="warning-box">
+                    💡 <strong>Troubleshooting tips:</strong><br>
+                    • Check your internet connection<br>
+                    • Ensure audio quality is good<br>
+                    • Try with a smaller file<br>
+                    • Check OpenAI API key and credits
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                raise RuntimeError(result['error'])
             if st.button("← Back to Upload"):
+                st.session_state.job_id = ""
+                st.query_params.pop("job", None)
                 st.session_state.current_step = 1
                 st.rerun()
             st.stop()
         
-        status_text.info("🌍 Generating Thanglish and English translations...")
-        progress_bar.progress(85)
-        time.sleep(1)
-        
-        translations = generate_initial_translations(tamil_transcript)
-        
-        status_text.info("💾 Saving results...")
-        progress_bar.progress(95)
-        time.sleep(0.5)
+        results = result['results']
+        st.session_state.audio_hash = result['cache_key']
+        with open(result['audio_path'], "rb") as audio_file:
+            st.session_state.audio_content = audio_file.read()
         
-        st.session_state.original_transcript = tamil_transcript
-        st.session_state.tamil_transcript = translations['tamil']
-        st.session_state.tanglish_transcript = translations['tanglish']
-        st.session_state.english_transcript = translations['english']
-        st.session_state.timestamps = timestamps_data
-        st.session_state.original_translations = translations.copy()
-        st.session_state.original_translations['timestamps'] = timestamps_data
-        
-        cache_translation_results(audio_hash, st.session_state.original_translations)
+        if not result['from_cache']:
+            # The memory report and any failure notice are shown together
+            messages = []
+            memory_stats = result['memory_stats']
+            if memory_stats and memory_stats['hits']:
+                messages.append(
+                    f"🧠 Translation memory reused {memory_stats['hits']}/{memory_stats['hits'] + memory_stats['misses']} "
+                    f"sentences ({memory_stats['hit_rate']:.0%}), saving ~{memory_stats['tokens_saved']:,} tokens."
+                )
+            if result['translation_errors']:
+                failed = ", ".join(name.title() for name in result['translation_errors'])
+                messages.append(f"⚠️ {failed} translation failed. Use 'AI Re-translate' to try again.")
+            if messages:
+                st.session_state.save_message = "<br>".join(messages)
         
+        st.session_state.original_transcript = results['tamil']
+        st.session_state.tamil_transcript = results['tamil']
+        st.session_state.tanglish_transcript = results['tanglish']
+        st.session_state.english_transcript = results['english']
+        st.session_state.timestamps = load_timeline(results.get('timestamps'))
+        st.session_state.original_translations = results
         st.session_state.editing_mode = True
         st.session_state.current_step = 3
-        
-        progress_bar.progress(100)
-        status_text.success("✅ Processing complete with OpenAI Whisper!")
-        time.sleep(1)
         st.rerun()
 
     except Exception as e:
@@ -983,6 +938,35 @@ elif st.session_state.current_step == 3 and st.session_state.editing_mode:
     </div>
     """, unsafe_allow_html=True)
     
+    line_store = sync_line_store()
+    
+    # Measured time per processing stage for the last job
+    if st.session_state.get('stage_timings'):
+        with st.expander("⏱️ Processing Time Breakdown", expanded=False):
+            total_seconds = sum(seconds for _, seconds in st.session_state.stage_timings)
+            for stage_name, seconds in st.session_state.stage_timings:
+                share = seconds / total_seconds if total_seconds else 0
+                st.markdown(f"**{stage_name.title()}:** {seconds:.2f}s ({share:.0%})")
+            st.markdown(f"**Total:** {total_seconds:.2f}s")
+            if st.session_state.get('translation_latency'):
+                st.markdown(f"**Gemini calls:** {latency_summary(st.session_state.translation_latency)}")
+            pool_metrics = load_job_runner().pool_metrics()
+            if pool_metrics and pool_metrics['openai'].get('requests'):
+                openai_pool = pool_metrics['openai']
+                st.caption(
+                    f"API connections: {openai_pool['requests']} Whisper requests over "
+                    f"{openai_pool.get('connections_opened', 0)} connections "
+                    f"(pool {openai_pool.get('pool_size', HTTP_POOL_SIZE)}), "
+                    f"{pool_metrics['gemini']['requests']} Gemini calls"
+                )
+            if pool_metrics and pool_metrics.get('result_cache'):
+                cache_stats = pool_metrics['result_cache']
+                st.caption(
+                    f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.0%}), {cache_stats['evictions']} evictions, "
+                    f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024 / 1024:.1f} MB)"
+                )
+    
     # Editing guide dropdown
     with st.expander("📚 Editing Guide & Tips", expanded=False):
         st.markdown("""
@@ -1000,8 +984,8 @@ elif st.session_state.current_step == 3 and st.session_state.editing_mode:
         - "இருக்கு" → "iruku", "வருகிறேன்" → "varukiren"
         
         **Editing Tools Explained:**
-        - **Smart Sync**: Quick local sync between languages
-        - **AI Re-translate**: Full AI-powered translation for major edits
+        - **Smart Sync**: Local sync that carries unchanged lines over and flags edited ones
+        - **AI Re-translate**: AI translation of only the lines you edited since the last translation
         - **Reset Original**: Restore to initial Whisper transcription
         
         **Pro Tips:**
@@ -1018,31 +1002,60 @@ elif st.session_state.current_step == 3 and st.session_state.editing_mode:
     with col1:
         st.markdown('<div class="secondary-button">', unsafe_allow_html=True)
         if st.button("🔄 Smart Sync", help="Sync other languages with your edits locally", use_container_width=True):
+            if not st.session_state.original_translations:
+                st.session_state.save_message = "⚠️ No original translation to sync from."
+                st.rerun()
             with st.spinner("🔄 Syncing languages..."):
-                synced_result, change_type = smart_text_sync(
-                    st.session_state.tanglish_transcript, 
-                    st.session_state.original_translations
-                )
+                aligned = align_lines(st.session_state.original_translations, line_store.items())
+                stale_lines = line_store.apply_alignment(aligned)
+                tamil, english = line_store.translated_texts()
+                st.session_state.tamil_transcript = tamil
+                st.session_state.english_transcript = english
                 
-                if synced_result:
-                    st.session_state.tamil_transcript = synced_result['tamil']
-                    st.session_state.english_transcript = synced_result['english']
-                    st.session_state.save_message = "✅ Languages synced locally!"
+                if stale_lines:
+                    shown = ", ".join(str(number) for number in stale_lines[:10])
+                    more = f" and {len(stale_lines) - 10} more" if len(stale_lines) > 10 else ""
+                    st.session_state.save_message = (
+                        f"🔄 Synced locally. {len(stale_lines)} edited line(s) are out of date in Tamil/English "
+                        f"(line {shown}{more}); 'AI Re-translate' updates just those."
+                    )
                 else:
-                    st.session_state.save_message = "⚠️ Major changes detected. Use 'AI Re-translate' for better accuracy."
+                    st.session_state.save_message = "✅ Languages synced locally!"
                 st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
-        if st.button("🤖 AI Re-translate", help="Use AI to re-translate all languages", use_container_width=True):
-            with st.spinner("🤖 Re-translating with AI..."):
+        if st.button("🤖 AI Re-translate", help="Use AI to re-translate the lines you edited", use_container_width=True):
+            # Align first so lines that still match the original translation are not sent
+            if st.session_state.original_translations:
+                line_store.apply_alignment(align_lines(st.session_state.original_translations, line_store.items()))
+            pending = line_store.pending_ids()
+            if not pending:
+                tamil, english = line_store.translated_texts()
+                st.session_state.tamil_transcript = tamil
+                st.session_state.english_transcript = english
+                st.session_state.save_message = "✅ Tamil and English are already up to date with your edits."
+                st.rerun()
+            with st.spinner(f"🤖 Re-translating {len(pending)} line(s) with AI..."):
                 try:
-                    new_translations = generate_initial_translations(st.session_state.tanglish_transcript)
+                    retranslated = retranslate_lines(generative_model, line_store.items(), pending)
+                    line_store.apply_translations(retranslated['lines'])
                     
-                    st.session_state.tamil_transcript = new_translations['tamil']
-                    st.session_state.english_transcript = new_translations['english']
-                    st.session_state.save_message = "✅ Re-translated with AI!"
-                    st.rerun()
+                    # Splice only once every line has a translation; lines that
+                    # succeeded are kept for the next attempt either way
+                    if not line_store.pending_ids():
+                        tamil, english = line_store.translated_texts()
+                        st.session_state.tamil_transcript = tamil
+                        st.session_state.english_transcript = english
+                    
+                    if retranslated['errors']:
+                        first_error = next(iter(retranslated['errors'].values()))
+                        st.error(
+                            f"❌ Re-translation failed for {len(line_store.pending_ids())} line(s): {first_error}"
+                        )
+                    else:
+                        st.session_state.save_message = f"✅ Re-translated {len(pending)} edited line(s) with AI!"
+                        st.rerun()
                 except Exception as e:
                     st.error(f"❌ Re-translation failed: {e}")
     
@@ -1061,35 +1074,43 @@ elif st.session_state.current_step == 3 and st.session_state.editing_mode:
     st.markdown("#### 📝 Line-by-Line Editor")
     st.markdown('<div class="line-editor">', unsafe_allow_html=True)
     
-    # Convert to line-by-line format
-    lines = st.session_state.tanglish_transcript.split('.')
-    lines = [line.strip() for line in lines if line.strip()]
+    # Lines live in the LineStore keyed by stable ids; only one page of
+    # text inputs is rendered per run
+    page_count = line_store.page_count()
+    if st.session_state.get('editor_page', 1) > page_count:
+        st.session_state.editor_page = 1
+    page_number = 1
+    if page_count > 1:
+        page_number = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key="editor_page"
+        )
+    page_lines = line_store.page(page_number)
     
-    edited_lines = []
-    for i, line in enumerate(lines):
-        edited_line = st.text_input(
-            f"Line {i+1}",
+    # sync_line_store applies what is typed here at the start of the rerun it triggers
+    for position, (line_number, line_id, line) in enumerate(page_lines):
+        st.text_input(
+            f"Line {line_number}",
             value=line,
-            key=f"line_{i}",
+            key=f"editor_line_{line_id}",
             label_visibility="collapsed"
         )
-        edited_lines.append(edited_line)
         
         # Improved line divider
-        if i < len(lines) - 1:
+        if position < len(page_lines) - 1:
             st.markdown('<div class="line-divider"></div>', unsafe_allow_html=True)
     
-    st.markdown('</div>', unsafe_allow_html=True)
+    if page_count > 1 and page_lines:
+        st.caption(f"Lines {page_lines[0][0]}–{page_lines[-1][0]} of {len(line_store)}")
     
-    # Update transcript from lines
-    new_transcript = '. '.join(edited_lines)
-    if new_transcript != st.session_state.tanglish_transcript:
-        st.session_state.tanglish_transcript = new_transcript
-        st.session_state.save_message = ""
+    st.markdown('</div>', unsafe_allow_html=True)
     
-    # Stats with better styling
-    word_count = len(new_transcript.split()) if new_transcript else 0
-    char_count = len(new_transcript) if new_transcript else 0
+    # Stats with better styling, kept up to date per line by the store
+    word_count = line_store.words
+    char_count = line_store.characters
     estimated_duration = word_count / 150 if word_count > 0 else 0
     
     st.markdown("#### 📊 Statistics")
@@ -1173,6 +1194,12 @@ elif st.session_state.current_step == 4:
         - Compatible with YouTube, Vimeo, and other platforms
         - Precise timing information for perfect video sync
         
+        **🌐 Other Subtitle Formats:**
+        - VTT: HTML5 video players and the web
+        - ASS: styled subtitles for Aegisub and VLC
+        - TTML: broadcast and streaming platforms
+        - JSON: cues with word-level timings for custom players
+        
         **💡 Pro Tips:**
         - Use 42 characters max for readable subtitles
         - Single line works best for mobile viewing
@@ -1193,12 +1220,12 @@ elif st.session_state.current_step == 4:
         
         export_format = st.selectbox(
             "📄 Format",
-            ["TXT", "SRT"],
-            help="TXT for text, SRT for video subtitles with Whisper timestamps"
+            ["TXT", "SRT", "VTT", "ASS", "TTML", "JSON"],
+            help="TXT for text; SRT, VTT, ASS, TTML or JSON for video subtitles with Whisper timestamps"
         )
     
     with col2:
-        if export_format == "SRT":
+        if export_format != "TXT":
             max_chars = st.slider(
                 "🔤 Max characters per subtitle",
                 min_value=20, max_value=80, value=42,
@@ -1219,6 +1246,8 @@ elif st.session_state.current_step == 4:
         else:
             st.markdown("#### 📄 Text Export")
             st.markdown("Clean text format for documents and scripts")
+            # Subtitle settings for the bundle export below
+            max_chars, min_duration, lines_per_subtitle = 42, 3, "Single"
 
     # Preview section
     st.markdown("#### 👁️ Export Preview")
@@ -1231,55 +1260,27 @@ elif st.session_state.current_step == 4:
     else:
         export_text = st.session_state.english_transcript
     
-    if export_format == "SRT":
-        # Create SRT preview with Whisper timestamps
-        def create_srt_preview(text, timestamps, max_chars=42):
-            def format_time(seconds):
-                td = timedelta(seconds=seconds)
-                total_seconds = int(td.total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                secs = total_seconds % 60
-                millis = int((td.total_seconds() - total_seconds) * 1000)
-                return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
-            words = text.split()
-            srt_content = ""
-            chunk_size = 8
-            
-            for i in range(0, min(len(words), 24), chunk_size):  # Preview first 3 subtitles
-                chunk_words = words[i : i + chunk_size]
-                if not chunk_words:
-                    continue
-                
-                # Use Whisper timestamps if available
-                if timestamps and i < len(timestamps):
-                    start_time = timestamps[min(i, len(timestamps) - 1)].get('start_time', i * 2)
-                    end_time = timestamps[min(i + chunk_size - 1, len(timestamps) - 1)].get('end_time', (i + chunk_size) * 2)
-                else:
-                    start_time = i * 2
-                    end_time = (i + chunk_size) * 2
-                
-                text_chunk = " ".join(chunk_words)
-                
-                # Respect character limit
-                if len(text_chunk) > max_chars:
-                    text_chunk = text_chunk[:max_chars-3] + "..."
-                
-                subtitle_num = (i // chunk_size) + 1
-                srt_content += f"{subtitle_num}\n"
-                srt_content += f"{format_time(start_time)} --> {format_time(end_time)}\n"
-                srt_content += f"{text_chunk}\n\n"
-            
-            srt_content += "... (preview of first 3 subtitles with Whisper timestamps)"
-            return srt_content
-        
-        preview_content = create_srt_preview(
-            export_text, 
-            st.session_state.timestamps,
-            max_chars if 'max_chars' in locals() else 42
+    # Result key for the language, used for TTML/JSON language tags
+    language_key = EXPORT_LANGUAGE_KEYS[export_language]
+    
+    # Timelines and files are memoized per session by transcript version,
+    # language, format and settings; see export_cache.py
+    if 'export_cache' not in st.session_state:
+        st.session_state.export_cache = ExportCache()
+    export_cache = st.session_state.export_cache
+    subtitle_settings = (max_chars, 2 if lines_per_subtitle == "Double" else 1, min_duration)
+    
+    if export_format != "TXT":
+        # Only the first cues are built unless the full timeline is cached
+        preview_cues, cue_total = export_cache.preview_cues(
+            export_text, st.session_state.timestamps, st.session_state.audio_hash, subtitle_settings
         )
-        st.code(preview_content, language="srt")
+        preview_content = render_subtitles(preview_cues, export_format.lower(), language_key)
+        if cue_total is None:
+            preview_content += f"\n... (preview of first {PREVIEW_CUES} subtitles with Whisper timestamps)"
+        else:
+            preview_content += f"\n... (preview of first {PREVIEW_CUES} of {cue_total} subtitles with Whisper timestamps)"
+        st.code(preview_content, language={'JSON': "json", 'TTML': "xml"}.get(export_format, "srt"))
         
     else:
         # Text preview
@@ -1289,10 +1290,10 @@ elif st.session_state.current_step == 4:
     # Enhanced download section
     st.markdown("#### 📥 Download Your Captions")
     
-    # Initialize download state
+    # Initialize download state; the file itself stays in the export cache
     if 'download_ready' not in st.session_state:
         st.session_state.download_ready = False
-        st.session_state.download_data = ""
+        st.session_state.download_key = None
         st.session_state.download_filename = ""
     
     col1, col2 = st.columns([1, 1])
@@ -1303,70 +1304,29 @@ elif st.session_state.current_step == 4:
         if st.button("🔄 Generate File", type="primary", use_container_width=True):
             with st.spinner(f"🔄 Preparing {export_language} {export_format} file..."):
                 try:
-                    if export_format == "TXT":
-                        file_data = export_text
-                        mime_type = "text/plain"
-                        file_extension = "txt"
-                    else:
-                        # Create full SRT with Whisper timestamps
-                        def create_full_srt(text, timestamps, max_chars=42):
-                            def format_time(seconds):
-                                td = timedelta(seconds=seconds)
-                                total_seconds = int(td.total_seconds())
-                                hours = total_seconds // 3600
-                                minutes = (total_seconds % 3600) // 60
-                                secs = total_seconds % 60
-                                millis = int((td.total_seconds() - total_seconds) * 1000)
-                                return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
-                            words = text.split()
-                            srt_content = ""
-                            chunk_size = 8
-                            
-                            for i in range(0, len(words), chunk_size):
-                                chunk_words = words[i : i + chunk_size]
-                                if not chunk_words:
-                                    continue
-                                
-                                if timestamps and i < len(timestamps):
-                                    start_time = timestamps[min(i, len(timestamps) - 1)].get('start_time', i * 2)
-                                    end_time = timestamps[min(i + chunk_size - 1, len(timestamps) - 1)].get('end_time', (i + chunk_size) * 2)
-                                else:
-                                    start_time = i * 2
-                                    end_time = (i + chunk_size) * 2
-                                
-                                text_chunk = " ".join(chunk_words)
-                                
-                                if len(text_chunk) > max_chars:
-                                    text_chunk = text_chunk[:max_chars-3] + "..."
-                                
-                                subtitle_num = (i // chunk_size) + 1
-                                srt_content += f"{subtitle_num}\n"
-                                srt_content += f"{format_time(start_time)} --> {format_time(end_time)}\n"
-                                srt_content += f"{text_chunk}\n\n"
-                            
-                            return srt_content
-                        
-                        file_data = create_full_srt(
-                            export_text, 
-                            st.session_state.timestamps,
-                            max_chars if 'max_chars' in locals() else 42
-                        )
-                        mime_type = "text/plain"
-                        file_extension = "srt"
+                    format_name = export_format.lower()
+                    download_key, file_data = export_cache.rendered(
+                        export_text,
+                        st.session_state.timestamps,
+                        st.session_state.audio_hash,
+                        language_key,
+                        format_name,
+                        subtitle_settings
+                    )
+                    file_extension, mime_type = export_file_details(format_name)
                     
                     filename = f"thanglish_captions_{export_language.lower()}.{file_extension}"
                     
                     # Store in session state
                     st.session_state.download_ready = True
-                    st.session_state.download_data = file_data
+                    st.session_state.download_key = download_key
                     st.session_state.download_filename = filename
                     st.session_state.download_mime = mime_type
                     
                     st.markdown(f"""
                     <div class="success-box">
                         ✅ <strong>File generated successfully!</strong><br>
-                        📁 File: {filename} | 📊 Size: {len(file_data.encode('utf-8')) / 1024:.1f} KB<br>
+                        📁 File: {filename} | 📊 Size: {len(file_data) / 1024:.1f} KB<br>
                         💡 Click "Download" to save your captions!<br>
                         🚀 <strong>Powered by:</strong> OpenAI Whisper + Gemini AI
                     </div>
@@ -1378,10 +1338,11 @@ elif st.session_state.current_step == 4:
     
     with col2:
         # Download button (only appears after generation)
-        if st.session_state.download_ready:
+        download_data = export_cache.get(st.session_state.download_key) if st.session_state.download_ready else None
+        if download_data is not None:
             st.download_button(
                 label=f"📥 Download {export_language} {export_format}",
-                data=st.session_state.download_data,
+                data=download_data,
                 file_name=st.session_state.download_filename,
                 mime=st.session_state.download_mime,
                 use_container_width=True,
@@ -1395,6 +1356,64 @@ elif st.session_state.current_step == 4:
             </div>
             """, unsafe_allow_html=True)
     
+    # Every selected language and format in one ZIP
+    st.markdown("#### 📦 Export Bundle")
+    bundle_col1, bundle_col2 = st.columns(2)
+    with bundle_col1:
+        bundle_languages = st.multiselect(
+            "🌍 Languages",
+            ["Thanglish", "Tamil", "English"],
+            default=["Thanglish", "Tamil", "English"],
+            key="bundle_languages"
+        )
+    with bundle_col2:
+        bundle_formats = st.multiselect(
+            "📄 Formats",
+            ["TXT", "SRT", "VTT", "ASS", "TTML", "JSON"],
+            default=["TXT", "SRT", "VTT", "ASS", "TTML", "JSON"],
+            key="bundle_formats"
+        )
+    st.caption("Subtitle files use the subtitle settings above. A manifest.json lists every file.")
+    
+    if st.button("📦 Build ZIP Bundle", disabled=not (bundle_languages and bundle_formats), use_container_width=True):
+        with st.spinner(f"📦 Building {len(bundle_languages) * len(bundle_formats)} files..."):
+            try:
+                bundle_buffer = io.BytesIO()
+                manifest = build_bundle(
+                    {
+                        'tanglish': st.session_state.tanglish_transcript,
+                        'tamil': st.session_state.tamil_transcript,
+                        'english': st.session_state.english_transcript
+                    },
+                    st.session_state.timestamps,
+                    bundle_buffer,
+                    languages=[EXPORT_LANGUAGE_KEYS[name] for name in bundle_languages],
+                    formats=[name.lower() for name in bundle_formats],
+                    max_chars=max_chars,
+                    max_lines=2 if lines_per_subtitle == "Double" else 1,
+                    min_duration=min_duration
+                )
+                st.session_state.bundle_data = bundle_buffer.getvalue()
+                st.session_state.bundle_summary = (
+                    f"{len(manifest['files'])} files | 📊 Size: {len(st.session_state.bundle_data) / 1024:.1f} KB"
+                )
+            except Exception as e:
+                st.error(f"❌ Bundle failed: {e}")
+    
+    if st.session_state.get('bundle_data'):
+        st.markdown(
+            f'<div class="success-box">✅ <strong>Bundle ready:</strong> {st.session_state.bundle_summary}</div>',
+            unsafe_allow_html=True
+        )
+        st.download_button(
+            label="📥 Download ZIP Bundle",
+            data=st.session_state.bundle_data,
+            file_name="thanglish_captions.zip",
+            mime="application/zip",
+            use_container_width=True,
+            type="primary"
+        )
+    
     # Additional actions
     st.markdown("#### 🔄 Next Steps")
     col1, col2 = st.columns(2)
@@ -1414,6 +1433,8 @@ elif st.session_state.current_step == 4:
                     st.session_state[var] = ""
             # Reset download state
             st.session_state.download_ready = False
+            st.session_state.bundle_data = None
+            st.query_params.pop("job", None)
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1429,6 +1450,7 @@ elif st.session_state.current_step == 4:
     if st.button("← Back to Edit"):
         st.session_state.current_step = 3
         st.session_state.download_ready = False
+        st.session_state.bundle_data = None
         st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -0,0 +1,183 @@
+from audio_processing import TRANSPORT_FORMATS, process_video_to_audio
+from cache_keys import make_cache_key, pipeline_fingerprint
+from stages import StageTracker
+from transcription import transcribe_audio
+from translation import (
+    apply_local_tanglish,
+    choose_translation_mode,
+    generate_initial_translations,
+    sentence_segments,
+    translate_segments,
+    translate_with_memory,
+)
+from word_timeline import WordTimeline
+
+# Settings chosen in Step 1; anything not given falls back to these
+DEFAULT_SETTINGS = {
+    'language': None,
+    'transport': 'auto',
+    'translation_mode': 'auto',
+    'use_translation_memory': True,
+    'tanglish_backend': 'gemini'
+}
+
+# Allowed values for the settings that have a fixed set, shared by the CLI and service
+SETTING_CHOICES = {
+    'transport': ['auto'] + list(TRANSPORT_FORMATS),
+    'translation_mode': ['auto', 'full', 'segments'],
+    'tanglish_backend': ['gemini', 'local']
+}
+
+
+def resolve_settings(settings):
+    return {**DEFAULT_SETTINGS, **(settings or {})}
+
+
+def pipeline_cache_key(content_hash, settings):
+    settings = resolve_settings(settings)
+    return make_cache_key(
+        content_hash,
+        pipeline_fingerprint(
+            settings['language'] or "ta", settings['transport'], settings['translation_mode'],
+            settings['use_translation_memory'], settings['tanglish_backend']
+        )
+    )
+
+
+def translate_transcript(generative_model, tamil_transcript, segments_data, settings,
+                         translation_memory=None, progress_callback=None):
+    """
+    Run the configured translation path for a Whisper result.
+
+    Returns:
+        dict: tamil/tanglish/english (and timed 'segments' in segment mode),
+              plus 'latency', 'errors' and, with translation memory, 'memory'
+    """
+    settings = resolve_settings(settings)
+    local_tanglish = settings['tanglish_backend'] == "local"
+
+    # Long transcripts are translated per segment so each line keeps its timing
+    mode = choose_translation_mode(tamil_transcript, segments_data, settings['translation_mode'])
+
+    if settings['use_translation_memory'] and translation_memory is not None:
+        # Known sentences come from memory; only the rest go to Gemini
+        units = segments_data if mode == "segments" else sentence_segments(tamil_transcript)
+        translations = translate_with_memory(
+            generative_model, translation_memory, units, english_only=local_tanglish,
+            progress_callback=progress_callback
+        )
+        if local_tanglish:
+            apply_local_tanglish(translations)
+        if mode != "segments":
+            # Sentence units carry no timing, so they are not kept as segments
+            translations.pop('segments')
+    elif mode == "segments":
+        translations = translate_segments(
+            generative_model, segments_data, progress_callback=progress_callback, english_only=local_tanglish
+        )
+        if local_tanglish:
+            apply_local_tanglish(translations)
+    else:
+        translations = generate_initial_translations(
+            generative_model, tamil_transcript, tanglish_backend=settings['tanglish_backend']
+        )
+    return translations
+
+
+def run_pipeline(content, content_hash, settings, openai_client, generative_model, result_cache,
+                 translation_memory=None, tracker=None, duration_ms=None):
+    """
+    Process one uploaded file end to end: cache lookup, audio extraction,
+    Whisper transcription, translation and cache write. Results with any
+    translation errors are returned but not cached.
+
+    Each step runs as a StageTracker stage, so callers get start/progress/end
+    events with measured durations.
+
+    Returns:
+        dict: success, from_cache, cache_key and 'results' (tamil, tanglish,
+              english, encoded WordTimeline 'timestamps', optional segments). Fresh runs add the
+              processed 'audio' and translation latency/errors/memory stats.
+              Failures have success False, the failing 'stage' and 'error'.
+    """
+    settings = resolve_settings(settings)
+    tracker = tracker or StageTracker()
+
+    with tracker.stage('hash'):
+        cache_key = pipeline_cache_key(content_hash, settings)
+
+    with tracker.stage('cache'):
+        cached_results = result_cache.get(cache_key)
+
+    if cached_results:
+        tracker.skip('extract', 'transcribe', 'translate', 'save')
+        return {
+            'success': True,
+            'from_cache': True,
+            'cache_key': cache_key,
+            'results': cached_results
+        }
+
+    with tracker.stage('extract'):
+        # Stream through ffmpeg to 16kHz mono WAV without decoding it all in memory
+        audio, success = process_video_to_audio(
+            content,
+            lambda seconds, fraction: tracker.progress(
+                'extract', fraction, f"{seconds / 60:.1f} min decoded"
+            ),
+            duration_ms
+        )
+    if not success:
+        return {'success': False, 'stage': 'extract', 'error': "Could not extract audio"}
+
+    with tracker.stage('transcribe'):
+        whisper_result = transcribe_audio(
+            openai_client, audio, settings['language'] or "ta",
+            transport=settings['transport'],
+            progress_callback=lambda done, total: tracker.progress(
+                'transcribe', done / total, f"chunk {done}/{total}"
+            )
+        )
+    if not whisper_result['success']:
+        return {
+            'success': False,
+            'stage': 'transcribe',
+            'error': whisper_result.get('error', 'Unknown error')
+        }
+
+    tamil_transcript = whisper_result['transcript']
+    if not tamil_transcript.strip():
+        return {'success': False, 'stage': 'transcribe', 'error': "empty transcript", 'empty': True}
+
+    with tracker.stage('translate'):
+        translations = translate_transcript(
+            generative_model, tamil_transcript, whisper_result.get('segments', []), settings,
+            translation_memory,
+            progress_callback=lambda done, total: tracker.progress(
+                'translate', done / total, f"batch {done}/{total}"
+            )
+        )
+
+    latency = translations.pop('latency')
+    errors = translations.pop('errors')
+    memory_stats = translations.pop('memory', None)
+
+    # Word timings are stored compactly; see word_timeline.py
+    results = {**translations, 'timestamps': WordTimeline.from_dicts(whisper_result['timestamps']).encode()}
+    if errors:
+        # Partial results are returned but never cached, so the next run retries them
+        tracker.skip('save')
+    else:
+        with tracker.stage('save'):
+            result_cache.set(cache_key, results)
+
+    return {
+        'success': True,
+        'from_cache': False,
+        'cache_key': cache_key,
+        'results': results,
+        'audio': audio,
+        'translation_latency': latency,
+        'translation_errors': errors,
+        'memory_stats': memory_stats
+    }
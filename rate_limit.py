@@ -0,0 +1,143 @@
+"""
+Token-bucket rate limiting for provider calls, shared by every session and
+job in a process, or by every process when a state directory is set.
+
+Each provider has a requests-per-minute bucket and a units-per-minute
+bucket (Whisper: audio seconds, Gemini: tokens). Callers reserve capacity
+before each request and then sleep until their reservation is due; the
+bucket level may go negative, so reservations are served strictly in the
+order they were made and the wait for the next caller is always known.
+
+Limits come from the environment so the app, job worker, CLI and service
+share one configuration:
+
+    THANGLISH_WHISPER_RPM, THANGLISH_WHISPER_AUDIO_SECONDS_PER_MIN,
+    THANGLISH_GEMINI_RPM, THANGLISH_GEMINI_TPM,
+    THANGLISH_RATE_LIMIT_DIR (file-lock-backed state shared across processes)
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_LIMITS = {
+    'whisper': {'requests': 50, 'units': None},
+    'gemini': {'requests': 1000, 'units': 1000000}
+}
+
+LIMIT_ENV = {
+    'whisper': ("THANGLISH_WHISPER_RPM", "THANGLISH_WHISPER_AUDIO_SECONDS_PER_MIN"),
+    'gemini': ("THANGLISH_GEMINI_RPM", "THANGLISH_GEMINI_TPM")
+}
+
+STATE_FILE = "rate_limits.json"
+
+
+class RateLimiter:
+    """
+    Reserve-then-wait limiter over per-minute budgets.
+
+    limits maps a bucket name to its budget per minute (None for no limit);
+    each bucket holds up to one minute of budget.
+    """
+
+    def __init__(self, name, limits, state_dir=None):
+        self.name = name
+        self.limits = {bucket: per_minute for bucket, per_minute in limits.items() if per_minute}
+        self.state_path = os.path.join(state_dir, STATE_FILE) if state_dir else None
+        self.lock = threading.Lock()
+        self.state = {}
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def levels(self, state, now):
+        """Current level of each bucket after refilling since its last update"""
+        levels = {}
+        for bucket, per_minute in self.limits.items():
+            level, updated = state.get(f"{self.name}.{bucket}", (per_minute, now))
+            levels[bucket] = min(per_minute, level + (now - updated) * per_minute / 60)
+        return levels
+
+    def wait_for(self, levels, costs):
+        """Seconds until every bucket has refilled enough to cover costs"""
+        return max(
+            [max(costs.get(bucket, 0) - level, 0) * 60 / self.limits[bucket]
+             for bucket, level in levels.items()],
+            default=0.0
+        )
+
+    def with_state(self, update):
+        """Run update(state) under the process lock and, if shared, the file lock"""
+        with self.lock:
+            if self.state_path is None:
+                return update(self.state)
+            try:
+                import fcntl
+            except ImportError:
+                return update(self.state)
+            with open(self.state_path, "a+") as state_file:
+                fcntl.flock(state_file, fcntl.LOCK_EX)
+                try:
+                    state_file.seek(0)
+                    try:
+                        state = json.loads(state_file.read() or "{}")
+                    except ValueError:
+                        state = {}
+                    result = update(state)
+                    state_file.seek(0)
+                    state_file.truncate()
+                    json.dump(state, state_file)
+                    state_file.flush()
+                    return result
+                finally:
+                    fcntl.flock(state_file, fcntl.LOCK_UN)
+
+    def reserve(self, units=0):
+        """Take one request and units from the budgets; returns the seconds to wait first"""
+        def update(state):
+            now = time.time()
+            levels = self.levels(state, now)
+            costs = {'requests': 1, 'units': units}
+            wait = self.wait_for(levels, costs)
+            for bucket, level in levels.items():
+                state[f"{self.name}.{bucket}"] = (level - costs.get(bucket, 0), now)
+            return wait
+        return self.with_state(update)
+
+    def acquire(self, units=0):
+        """Block until this request's reservation is due; returns the seconds waited"""
+        wait = self.reserve(units)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def current_wait(self):
+        """Seconds a request made now would wait, without reserving anything"""
+        return self.with_state(lambda state: self.wait_for(self.levels(state, time.time()), {'requests': 1}))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limits_from_env(provider):
+    limits = dict(DEFAULT_LIMITS[provider])
+    for bucket, key in zip(('requests', 'units'), LIMIT_ENV[provider]):
+        if os.environ.get(key):
+            limits[bucket] = float(os.environ[key]) or None
+    return limits
+
+
+def get_rate_limiter(provider):
+    """The process's limiter for 'whisper' or 'gemini', built from the environment on first use"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(
+                provider, limits_from_env(provider), os.environ.get("THANGLISH_RATE_LIMIT_DIR") or None
+            )
+        return _limiters[provider]
+
+
+def rate_limit_waits():
+    """Current wait in seconds per provider, for progress displays"""
+    return {provider: get_rate_limiter(provider).current_wait() for provider in DEFAULT_LIMITS}
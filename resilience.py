@@ -0,0 +1,230 @@
+"""
+Retries, deadlines, hedging and circuit breaking for provider API calls.
+
+Every Whisper and Gemini request goes through call_with_resilience:
+
+- Each attempt first takes its place in the provider's shared rate limiter
+  (see rate_limit.py), so callers queue instead of tripping 429s.
+- 429s, 5xx responses, connection errors and timeouts are retried with
+  exponential backoff and full jitter (honouring Retry-After when given);
+  other errors such as 400s fail immediately.
+- Each call has an overall deadline; every attempt's request timeout is
+  the time left, so retries never run past it.
+- With hedge_after set, a duplicate request is started if the first has
+  not answered by then, and whichever finishes first wins.
+- A per-provider circuit breaker opens after repeated retryable failures
+  and fails calls fast until a cool-down has passed.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rate_limit import get_rate_limiter
+
+RETRY_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 20.0
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+# Duplicate slow Gemini requests after this many seconds; off unless set
+GEMINI_HEDGE_SECONDS = float(os.environ.get("THANGLISH_GEMINI_HEDGE_SECONDS") or 0) or None
+
+RETRYABLE_STATUS = {408, 409, 429}
+RETRYABLE_ERROR_NAMES = {
+    'APIConnectionError', 'APITimeoutError', 'ConnectError', 'ConnectTimeout', 'ReadTimeout',
+    'RemoteProtocolError', 'DeadlineExceeded', 'ServiceUnavailable', 'InternalServerError',
+    'TooManyRequests', 'ResourceExhausted'
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a call's retries run out of time"""
+
+
+def error_status(error):
+    """HTTP status of an OpenAI or Google API error, if it has one"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        code = getattr(error, 'code', None)
+        status = code if isinstance(code, int) else None
+    return status
+
+
+def is_retryable(error):
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(error):
+    """Server-requested wait from a Retry-After header, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS):
+    """Full-jitter exponential backoff for the given 1-based attempt"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Closed while calls succeed. After failure_threshold retryable failures in
+    a row it opens and rejects calls for reset_seconds, then lets one trial
+    call through (half-open); success closes it, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                return 'half-open'
+            return 'open'
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+            if remaining > 0 or self.trial_running:
+                raise CircuitOpenError(
+                    f"{self.name} is unavailable after repeated failures; "
+                    f"retrying in {max(remaining, 0):.0f}s"
+                )
+            self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+# One breaker per provider per process, shared by all threads
+BREAKERS = {
+    'whisper': CircuitBreaker('Whisper'),
+    'gemini': CircuitBreaker('Gemini')
+}
+
+
+def hedged(fn, timeout, hedge_after, duplicate=None):
+    """
+    Run fn(timeout); if it hasn't finished after hedge_after seconds, run a
+    duplicate (with duplicate(timeout) when given) and return the first
+    success, or raise the last failure.
+    """
+    # Not used as a context manager: exiting would wait on the losing request
+    executor = ThreadPoolExecutor(max_workers=2)
+    start = time.monotonic()
+    pending = {executor.submit(fn, timeout)}
+    error = None
+    try:
+        done, pending = wait(pending, timeout=min(hedge_after, timeout))
+        if not done and time.monotonic() - start < timeout:
+            pending.add(executor.submit(duplicate or fn, max(timeout - (time.monotonic() - start), 0)))
+        while done or pending:
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+            if not pending:
+                break
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+    finally:
+        executor.shutdown(wait=False)
+    if error is not None:
+        raise error
+    raise TimeoutError(f"no response within {timeout:.0f}s")
+
+
+def call_with_resilience(fn, provider, deadline, attempts=RETRY_ATTEMPTS, hedge_after=None, units=0):
+    """
+    Call fn(timeout) with rate limiting, retries, backoff and the provider's
+    circuit breaker.
+
+    Args:
+        fn: Makes one request; must honour the timeout (seconds) it is given
+        provider: Key into BREAKERS ('whisper' or 'gemini')
+        deadline: Seconds the whole call, including retries, may take
+        hedge_after: Seconds before a duplicate request is started, or None
+        units: Rate-limit units per request (Whisper audio seconds, Gemini tokens)
+    """
+    breaker = BREAKERS[provider]
+    limiter = get_rate_limiter(provider)
+    end = time.monotonic() + deadline
+    last_error = None
+
+    def hedge_request(timeout):
+        # A hedged duplicate is a real request, so it takes its own reservation
+        limiter.acquire(units)
+        return fn(timeout)
+
+    for attempt in range(1, attempts + 1):
+        if end - time.monotonic() <= 0:
+            break
+        limiter.acquire(units)
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        breaker.before_call()
+        try:
+            if hedge_after:
+                result = hedged(fn, remaining, hedge_after, hedge_request)
+            else:
+                result = fn(remaining)
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            last_error = e
+            if attempt == attempts:
+                break
+            delay = retry_after_seconds(e) or backoff_seconds(attempt)
+            if time.monotonic() + delay >= end:
+                break
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+    if last_error is not None:
+        raise last_error
+    raise DeadlineExceededError(f"{provider} call did not finish within {deadline:.0f}s")
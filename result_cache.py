@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "thanglish")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class SQLiteResultCache:
+    """
+    Result cache shared by every session and process on the machine.
+
+    Entries are JSON-encoded results keyed by content hash. Reads refresh the
+    entry's access time; writes evict least-recently-used entries until the
+    total size is back under max_bytes. Expired entries count as misses.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "results.sqlite3")
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                )
+            """)
+
+    def _bump(self, name, amount=1):
+        self.conn.execute(
+            "INSERT INTO stats (name, count) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET count = count + excluded.count",
+            (name, amount)
+        )
+
+    def get(self, key):
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] >= self.ttl_seconds:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bump('expired')
+                row = None
+
+            if row is None:
+                self._bump('misses')
+                return None
+
+            self.conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._bump('hits')
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        rows = self.conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bump('evictions', evicted)
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT name, count FROM stats").fetchall())
+            entries, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = counts.get('hits', 0) + counts.get('misses', 0)
+        return {
+            'hits': counts.get('hits', 0),
+            'misses': counts.get('misses', 0),
+            'expired': counts.get('expired', 0),
+            'evictions': counts.get('evictions', 0),
+            'hit_rate': counts.get('hits', 0) / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': total
+        }
+
+
+class FileResultCache:
+    """
+    Same interface as SQLiteResultCache, storing one JSON file per key.
+
+    File modification times track recency, so the directory can live on a
+    shared network mount. Counters are kept per process.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.directory = os.path.join(directory, "results")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            with self.lock:
+                self.counts['misses'] += 1
+            return None
+
+        with self.lock:
+            if time.time() - entry['created_at'] >= self.ttl_seconds:
+                self.counts['expired'] += 1
+                self.counts['misses'] += 1
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                return None
+            self.counts['hits'] += 1
+
+        # Touch the file so eviction sees it as recently used
+        os.utime(path)
+        return entry['value']
+
+    def set(self, key, value):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({'created_at': time.time(), 'value': value}, cache_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            with self.lock:
+                self.counts['evictions'] += 1
+
+    def stats(self):
+        entries = self._entries()
+        with self.lock:
+            counts = dict(self.counts)
+        lookups = counts['hits'] + counts['misses']
+        return {
+            **counts,
+            'hit_rate': counts['hits'] / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries)
+        }
+
+
+CACHE_BACKENDS = {
+    'sqlite': SQLiteResultCache,
+    'file': FileResultCache
+}
+
+
+def create_result_cache(backend="sqlite", directory=DEFAULT_CACHE_DIR,
+                        max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=DEFAULT_TTL_SECONDS):
+    """Build the configured cache backend ("sqlite" or "file")"""
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    return CACHE_BACKENDS[backend](directory, max_bytes, ttl_seconds)
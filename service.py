@@ -0,0 +1,269 @@
+"""
+HTTP job API for running the caption pipeline from other systems.
+
+    python -m service --port 8080 --media-root /srv/media
+
+Endpoints (all JSON unless noted):
+
+    POST /jobs                  raw upload body (?filename=...&language=...),
+                                or JSON {"path": ..., "settings": {...}}
+    GET  /jobs/<id>             status, progress, stage, queue position, error
+    GET  /jobs/<id>/transcripts Tamil, Thanglish and English text
+    GET  /jobs/<id>/captions.<format>?language=tanglish
+                                srt, vtt, ass, ttml or json subtitles
+    GET  /metrics               API client pool metrics and result cache stats from the job worker
+    GET  /health
+
+Jobs run in the same background worker process and job store as the
+Streamlit app, so both share the result cache and translation memory.
+"""
+import argparse
+import json
+import os
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from audio_processing import SUPPORTED_EXTENSIONS, probe_media, probe_media_bytes
+from cache_keys import hash_bytes, read_and_hash
+from jobs import ACTIVE_STATUSES, DEFAULT_JOB_DIR, JOB_MAX_WORKERS, JobRunner
+from pipeline import DEFAULT_SETTINGS, SETTING_CHOICES, pipeline_cache_key
+from result_cache import DEFAULT_CACHE_DIR
+from subtitles import SUBTITLE_FORMATS, build_cues, render_subtitles
+
+SERVICE_PORT = 8080
+MAX_UPLOAD_BYTES = 2 * 1024 ** 3
+
+LANGUAGES = ('tamil', 'tanglish', 'english')
+
+# Whisper language codes are ISO 639-1/639-3
+LANGUAGE_CODE = re.compile(r"^[a-z]{2,3}$")
+JOB_ROUTE = re.compile(
+    r"^/jobs/([0-9a-f]{32})(?:/(transcripts|captions\.(" + "|".join(SUBTITLE_FORMATS) + r")))?$"
+)
+
+
+def parse_settings(values):
+    """
+    Pipeline settings from query parameters or a JSON object; unknown keys
+    are ignored. Raises ValueError naming the first invalid setting.
+    """
+    settings = {}
+    for key in DEFAULT_SETTINGS:
+        if key not in values:
+            continue
+        value = values[key]
+        if key == 'use_translation_memory':
+            if isinstance(value, str) and value.lower() in ('1', 'true', 'yes', '0', 'false', 'no'):
+                value = value.lower() in ('1', 'true', 'yes')
+            if not isinstance(value, bool):
+                raise ValueError("use_translation_memory must be true or false")
+        elif key == 'language':
+            if value in (None, ""):
+                value = None
+            elif not isinstance(value, str) or not LANGUAGE_CODE.match(value):
+                raise ValueError("language must be a Whisper language code such as 'ta'")
+        elif value not in SETTING_CHOICES[key]:
+            raise ValueError(f"{key} must be one of {', '.join(SETTING_CHOICES[key])}")
+        settings[key] = value
+    return settings
+
+
+def resolve_media_path(path, media_root):
+    """Absolute path of a file under media_root, or None if it is outside it"""
+    if not media_root:
+        return None
+    root = os.path.realpath(media_root)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full_path]) != root or not os.path.isfile(full_path):
+        return None
+    return full_path
+
+
+def job_status(runner, job):
+    status = {
+        'id': job['id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'stage': job['stage'],
+        'message': job['message'],
+        'timings': job['timings'] or []
+    }
+    if job['status'] == 'queued':
+        status['queue_position'] = runner.queue_position(job['id'])
+    elif job['status'] == 'failed':
+        status['error'] = job['result']['error'] if job['result'] else None
+        status['failed_stage'] = job['result'].get('stage') if job['result'] else None
+    elif job['status'] == 'done':
+        status['from_cache'] = job['result']['from_cache']
+        status['translation_latency'] = job['result'].get('translation_latency') or {}
+    return status
+
+
+class JobAPIHandler(BaseHTTPRequestHandler):
+    server_version = "ThanglishJobAPI/1.0"
+
+    def send_json(self, status, payload):
+        self.send_text(status, json.dumps(payload, ensure_ascii=False), "application/json")
+
+    def send_text(self, status, text, content_type):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.max_upload_bytes:
+            return None
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self.send_json(200, {'status': 'ok'})
+            return
+        if url.path == "/metrics":
+            pools = self.server.runner.pool_metrics()
+            result_cache = pools.pop('result_cache', None) if pools else None
+            self.send_json(200, {'pools': pools, 'result_cache': result_cache})
+            return
+
+        match = JOB_ROUTE.match(url.path)
+        if not match:
+            self.send_json(404, {'error': "not found"})
+            return
+
+        runner = self.server.runner
+        job = runner.get(match.group(1))
+        if job is None:
+            self.send_json(404, {'error': "unknown or expired job"})
+            return
+
+        if match.group(2) is None:
+            if job['status'] in ACTIVE_STATUSES:
+                runner.ensure_worker()
+            self.send_json(200, job_status(runner, job))
+            return
+
+        if job['status'] != 'done':
+            self.send_json(409, {'error': f"job is {job['status']}", 'status': job['status']})
+            return
+
+        results = job['result']['results']
+        if match.group(2) == 'transcripts':
+            self.send_json(200, {language: results.get(language, "") for language in LANGUAGES})
+            return
+
+        language = parse_qs(url.query).get('language', ['tanglish'])[0]
+        if language not in LANGUAGES:
+            self.send_json(400, {'error': f"language must be one of {', '.join(LANGUAGES)}"})
+            return
+        format_name = match.group(3)
+        cues = build_cues(results.get(language, ""), results.get('timestamps', []))
+        self.send_text(
+            200, render_subtitles(cues, format_name, language),
+            f"{SUBTITLE_FORMATS[format_name][2]}; charset=utf-8"
+        )
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            self.send_json(404, {'error': "not found"})
+            return
+
+        start = time.perf_counter()
+        body = self.read_body()
+        if body is None:
+            self.send_json(413, {'error': "upload too large"})
+            return
+
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                self.send_json(400, {'error': "invalid JSON"})
+                return
+            try:
+                settings = parse_settings(request.get('settings') or {})
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            path = resolve_media_path(request.get('path', ""), self.server.media_root)
+            if path is None:
+                self.send_json(400, {'error': "path must name a file under the service's media root"})
+                return
+            with open(path, "rb") as media_file:
+                content, content_hash = read_and_hash(media_file)
+            media_info = probe_media(path) or {}
+        else:
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            filename = query.get('filename', "")
+            extension = filename.lower().rsplit('.', 1)[-1] if '.' in filename else ""
+            if extension and extension not in SUPPORTED_EXTENSIONS:
+                self.send_json(400, {'error': f"unsupported file type: {extension}"})
+                return
+            if not body:
+                self.send_json(400, {'error': "empty upload"})
+                return
+            try:
+                settings = parse_settings(query)
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            # Hashed in place; the body is the only copy of the upload
+            content, content_hash = body, hash_bytes(body)
+            media_info = probe_media_bytes(content, f".{extension}" if extension else "") or {}
+
+        settings['duration_ms'] = media_info.get('duration_ms')
+        settings['read_seconds'] = time.perf_counter() - start
+
+        runner = self.server.runner
+        job_id = runner.submit(content, content_hash, pipeline_cache_key(content_hash, settings), settings)
+        self.send_json(202, job_status(runner, runner.get(job_id)))
+
+
+def create_server(host="127.0.0.1", port=SERVICE_PORT, job_dir=DEFAULT_JOB_DIR, cache_dir=DEFAULT_CACHE_DIR,
+                  max_workers=JOB_MAX_WORKERS, media_root=None, max_upload_bytes=MAX_UPLOAD_BYTES):
+    server = ThreadingHTTPServer((host, port), JobAPIHandler)
+    server.runner = JobRunner(directory=job_dir, max_workers=max_workers, cache_dir=cache_dir)
+    server.media_root = media_root
+    server.max_upload_bytes = max_upload_bytes
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Thanglish caption pipeline over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--cache-dir", default=os.environ.get("THANGLISH_CACHE_DIR", DEFAULT_CACHE_DIR))
+    parser.add_argument("--job-dir", default=None, help="Defaults to <cache-dir>/jobs")
+    parser.add_argument("--workers", type=int, default=JOB_MAX_WORKERS, help="Jobs run in parallel")
+    parser.add_argument("--media-root", default=None,
+                        help="Directory that JSON path submissions may read from (disabled if unset)")
+    parser.add_argument("--max-upload-mb", type=int, default=MAX_UPLOAD_BYTES // (1024 * 1024))
+    args = parser.parse_args()
+
+    for key in ("OPENAI_API_KEY", "GEMINI_API_KEY"):
+        if not os.environ.get(key):
+            parser.error(f"{key} is not set")
+
+    server = create_server(
+        args.host, args.port, args.job_dir or os.path.join(args.cache_dir, "jobs"), args.cache_dir,
+        args.workers, args.media_root, args.max_upload_mb * 1024 * 1024
+    )
+    server.runner.ensure_worker()
+    print(f"Serving on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
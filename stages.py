@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+
+# Processing stages in order, with their rough share of a typical job's
+# wall-clock time; used to turn stage events into one overall progress value
+STAGE_WEIGHTS = {
+    'read': 2,
+    'hash': 1,
+    'cache': 1,
+    'extract': 12,
+    'transcribe': 55,
+    'translate': 25,
+    'save': 4
+}
+
+
+class StageTracker:
+    """
+    Records start/progress/end events for each pipeline stage with measured
+    durations, and forwards every event to an optional listener.
+
+    Events are dicts: stage, type ("start", "progress", "end" or "skip"),
+    fraction of the stage done, message, and elapsed seconds for "end".
+    """
+
+    def __init__(self, listener=None, weights=STAGE_WEIGHTS):
+        self.listener = listener
+        self.weights = weights
+        self.events = []
+        self.durations = {}
+        self.fractions = {}
+
+    def emit(self, stage, event_type, fraction, message="", elapsed=None):
+        self.fractions[stage] = fraction
+        event = {
+            'stage': stage,
+            'type': event_type,
+            'fraction': fraction,
+            'message': message,
+            'elapsed': elapsed,
+            'timestamp': time.time()
+        }
+        self.events.append(event)
+        if self.listener:
+            self.listener(event)
+
+    @contextmanager
+    def stage(self, name, message=""):
+        """Time a stage; the end event is emitted even if the stage raises"""
+        self.emit(name, 'start', 0.0, message)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.durations[name] = elapsed
+            self.emit(name, 'end', 1.0, message, elapsed)
+
+    def progress(self, name, fraction, message=""):
+        if fraction is None:
+            fraction = self.fractions.get(name, 0.0)
+        self.emit(name, 'progress', min(max(fraction, 0.0), 1.0), message)
+
+    def record(self, name, elapsed, message=""):
+        """Add a stage that was timed elsewhere, e.g. the upload read in Step 1"""
+        self.durations[name] = elapsed
+        self.emit(name, 'end', 1.0, message, elapsed)
+
+    def skip(self, *names):
+        """Mark stages that won't run (e.g. after a cache hit) as done for progress"""
+        for name in names:
+            self.emit(name, 'skip', 1.0)
+
+    def overall_progress(self):
+        total = sum(self.weights.values())
+        done = sum(weight * self.fractions.get(name, 0.0) for name, weight in self.weights.items())
+        return done / total if total else 0.0
+
+    def breakdown(self):
+        """(stage, seconds) pairs in pipeline order for the stages that ran"""
+        ordered = [name for name in self.weights if name in self.durations]
+        ordered += [name for name in self.durations if name not in self.weights]
+        return [(name, self.durations[name]) for name in ordered]
+
+    def total_seconds(self):
+        return sum(self.durations.values())
@@ -0,0 +1,171 @@
+"""
+Local stand-ins for the Whisper and Gemini HTTP APIs, for exercising the
+CLI, job worker and HTTP service end to end without network access or API
+credits.
+
+    python -m standin_apis --port 8765
+    export OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    export GEMINI_API_ENDPOINT=http://127.0.0.1:8765
+    export OPENAI_API_KEY=test GEMINI_API_KEY=test
+
+Whisper returns a fixed Tamil sentence, repeated to roughly cover the
+uploaded audio, with word and segment timings. Gemini answers Thanglish
+prompts with the local transliteration engine, English prompts with a
+marked copy of the input, and segment prompts with JSON for every id.
+"""
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from audio_processing import BYTES_PER_SECOND
+from translation import ENGLISH_PROMPT, LINE_PROMPT, SEGMENT_ENGLISH_PROMPT, SEGMENT_PROMPT, TANGLISH_PROMPT
+from transliteration import transliterate
+
+STANDIN_PORT = 8765
+STANDIN_SENTENCE = "வணக்கம் நண்பர்களே இன்று நாம் ஒரு புதிய தொழில்நுட்பம் பற்றி பேசலாம்."
+SECONDS_PER_WORD = 0.5
+
+GEMINI_ROUTE = re.compile(r"^/v1(?:beta)?/models/[^/:]+:generateContent$")
+QUOTED_TEXT = re.compile(r'Text: "(.*?)"', re.DOTALL)
+
+# Prompt openings, used to tell the kinds of Gemini request apart
+TANGLISH_MARKER = TANGLISH_PROMPT.strip().splitlines()[0].strip()
+ENGLISH_MARKER = ENGLISH_PROMPT.strip().splitlines()[0].strip()
+SEGMENT_MARKER = SEGMENT_PROMPT.strip().splitlines()[0].strip()
+SEGMENT_ENGLISH_MARKER = SEGMENT_ENGLISH_PROMPT.strip().splitlines()[0].strip()
+LINE_MARKER = LINE_PROMPT.strip().splitlines()[0].strip()
+
+
+def whisper_response(upload_bytes):
+    """verbose_json transcription covering about as long as the upload lasts"""
+    words = STANDIN_SENTENCE.split()
+    sentence_seconds = len(words) * SECONDS_PER_WORD
+    repeats = max(1, min(int(upload_bytes / BYTES_PER_SECOND / sentence_seconds), 200))
+
+    word_entries = []
+    segments = []
+    for repeat in range(repeats):
+        offset = repeat * sentence_seconds
+        for index, word in enumerate(words):
+            start = offset + index * SECONDS_PER_WORD
+            word_entries.append({'word': word, 'start': start, 'end': start + SECONDS_PER_WORD})
+        segments.append({
+            'id': repeat, 'seek': 0, 'start': offset, 'end': offset + sentence_seconds,
+            'text': STANDIN_SENTENCE, 'tokens': [], 'temperature': 0.0, 'avg_logprob': 0.0,
+            'compression_ratio': 1.0, 'no_speech_prob': 0.0
+        })
+
+    return {
+        'task': 'transcribe',
+        'language': 'tamil',
+        'duration': repeats * sentence_seconds,
+        'text': " ".join([STANDIN_SENTENCE] * repeats),
+        'words': word_entries,
+        'segments': segments
+    }
+
+
+def prompt_items(prompt, heading):
+    """The JSON list that follows heading in a batch prompt"""
+    start = prompt.index("[", prompt.index(heading))
+    items, _ = json.JSONDecoder().raw_decode(prompt[start:])
+    return items
+
+
+def gemini_text(prompt):
+    if SEGMENT_MARKER in prompt or SEGMENT_ENGLISH_MARKER in prompt:
+        entries = []
+        for segment in prompt_items(prompt, "Segments ("):
+            entry = {'id': segment['id'], 'english': f"[en] {segment['text']}"}
+            if SEGMENT_MARKER in prompt:
+                entry['tanglish'] = transliterate(segment['text'])
+            entries.append(entry)
+        return json.dumps({'segments': entries}, ensure_ascii=False)
+
+    if LINE_MARKER in prompt:
+        # Thanglish lines come back as their own "Tamil" text
+        return json.dumps({'segments': [
+            {'id': line['id'], 'tamil': line['text'], 'english': f"[en] {line['text']}"}
+            for line in prompt_items(prompt, "Lines (")
+        ]}, ensure_ascii=False)
+
+    match = QUOTED_TEXT.search(prompt)
+    text = match.group(1) if match else prompt
+    if TANGLISH_MARKER in prompt:
+        return transliterate(text)
+    if ENGLISH_MARKER in prompt:
+        return f"[en] {text}"
+    return text
+
+
+def gemini_response(text):
+    return {
+        'candidates': [{
+            'content': {'parts': [{'text': text}], 'role': 'model'},
+            'finishReason': 'STOP',
+            'index': 0
+        }],
+        'usageMetadata': {'promptTokenCount': 0, 'candidatesTokenCount': 0, 'totalTokenCount': 0}
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "StandInAPIs/1.0"
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?", 1)[0]
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if path.endswith("/audio/transcriptions"):
+            self.send_json(200, whisper_response(len(body)))
+        elif GEMINI_ROUTE.match(path):
+            request = json.loads(body)
+            prompt = "".join(
+                part.get('text', "")
+                for content in request.get('contents', [])
+                for part in content.get('parts', [])
+            )
+            self.send_json(200, gemini_response(gemini_text(prompt)))
+        else:
+            self.send_json(404, {'error': {'message': f"no stand-in for {path}"}})
+
+
+def create_server(host="127.0.0.1", port=STANDIN_PORT, latency=0.0):
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.latency = latency
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in Whisper and Gemini APIs locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=STANDIN_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each reply")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency)
+    print(f"Stand-in APIs on http://{args.host}:{args.port}", flush=True)
+    print(f"  OPENAI_BASE_URL=http://{args.host}:{args.port}/v1")
+    print(f"  GEMINI_API_ENDPOINT=http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
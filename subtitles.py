@@ -0,0 +1,281 @@
+"""
+Subtitle cue timeline and format writers.
+
+Cues are built in one pass over the words. Each word gets a time from the
+Whisper word timings; when the export text has a different word count
+(Thanglish or English against Tamil timings), word positions are mapped
+proportionally onto the timings. A new cue starts when the next word would
+not fit in max_lines lines of max_chars, at a pause in the speech, after a
+sentence end once the cue has some text, or when the cue gets too long.
+Cues are held for at least min_duration seconds, but never into the next
+cue.
+
+The cue list is the shared timeline: build it once with build_cues, then
+serialize it with any writer in SUBTITLE_FORMATS. Writers are generators
+that yield the file piece by piece, so adding a format is one serializer.
+"""
+import json
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+from word_timeline import load_timeline
+
+# Gap between words (seconds) that always starts a new cue
+PAUSE_SPLIT_SECONDS = 0.7
+
+# Longest a single cue may stay on screen
+MAX_CUE_SECONDS = 7.0
+
+# A sentence end only closes a cue once it holds this share of its capacity
+SENTENCE_SPLIT_FILL = 0.5
+
+# Timing used for text without Whisper word timestamps
+FALLBACK_SECONDS_PER_WORD = 0.4
+
+SENTENCE_END = re.compile(r"[.!?।]['\")\]]*$")
+
+# BCP 47 tags for TTML/JSON output
+LANGUAGE_TAGS = {'tamil': "ta", 'tanglish': "ta-Latn", 'english': "en"}
+
+
+def format_time(seconds, separator=","):
+    """HH:MM:SS,mmm (SRT) or, with separator '.', HH:MM:SS.mmm (WebVTT)"""
+    millis = max(int(round(seconds * 1000)), 0)
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def word_times(word_count, timestamps):
+    """
+    (start, end) per word, mapping word positions onto the Whisper timings.
+
+    A generator, so building only the first few cues (previews) does not
+    time every word of the transcript.
+    """
+    timeline = load_timeline(timestamps)
+    if not timeline:
+        for index in range(word_count):
+            yield index * FALLBACK_SECONDS_PER_WORD, (index + 1) * FALLBACK_SECONDS_PER_WORD
+        return
+
+    timing_count = len(timeline)
+    start_ms = timeline.start_ms
+    end_ms = timeline.end_ms
+    for index in range(word_count):
+        timing = index * timing_count // word_count
+        start = start_ms[timing] / 1000
+        yield start, max(end_ms[timing] / 1000, start)
+
+
+def wrap_lines(words, max_chars, max_lines):
+    """
+    Split a cue's words into at most max_lines lines of up to max_chars,
+    balancing two-line cues so neither line is much longer than the other.
+    """
+    text = " ".join(words)
+    if max_lines < 2 or len(text) <= max_chars or len(words) < 2:
+        return [text]
+
+    # Lengths of the first line for each split point, built incrementally
+    best = None
+    first_length = -1
+    total = len(text)
+    for split in range(1, len(words)):
+        first_length += len(words[split - 1]) + 1
+        second_length = total - first_length - 1
+        longest = max(first_length, second_length)
+        if best is None or longest < best[0]:
+            best = (longest, split)
+    split = best[1]
+    return [" ".join(words[:split]), " ".join(words[split:])]
+
+
+def build_cues(text, timestamps, max_chars=42, max_lines=2, min_duration=0.0,
+               pause_seconds=PAUSE_SPLIT_SECONDS, max_cue_seconds=MAX_CUE_SECONDS, limit=None):
+    """
+    Segment text into timed cues.
+
+    Args:
+        timestamps: Whisper word timings, as a WordTimeline or its encoded/list form
+        max_chars: Characters per line; a single longer word gets its own line
+        max_lines: Lines per cue (1 or 2)
+        min_duration: Seconds each cue is shown for at least, if the next allows
+        limit: Stop after this many cues (for previews)
+
+    Returns:
+        list: {'start', 'end', 'lines', 'words'} dicts in order; 'words'
+              holds (word, start, end) for each word in the cue
+    """
+    words = text.split()
+    times = word_times(len(words), timestamps)
+    max_lines = min(max(1, max_lines), 2)
+    capacity = max_chars * max_lines
+
+    cues = []
+    current = []
+    current_times = []
+    # Characters on the current line and full lines above it in the cue
+    line_length = 0
+    lines_used = 0
+    cue_start = cue_end = 0.0
+
+    for word, timing in zip(words, times):
+        start, end = timing
+        if current:
+            wraps = line_length + 1 + len(word) > max_chars
+            filled = lines_used * max_chars + line_length
+            if ((wraps and lines_used + 1 >= max_lines)
+                    or start - cue_end >= pause_seconds
+                    or end - cue_start > max_cue_seconds
+                    or (filled >= capacity * SENTENCE_SPLIT_FILL and SENTENCE_END.search(current[-1]))):
+                cues.append({'start': cue_start, 'end': cue_end,
+                             'lines': wrap_lines(current, max_chars, max_lines),
+                             'words': current_times})
+                if limit is not None and len(cues) > limit:
+                    break
+                current = []
+                current_times = []
+
+        if not current:
+            cue_start = start
+            cue_end = end
+            line_length = len(word)
+            lines_used = 0
+        elif line_length + 1 + len(word) > max_chars:
+            lines_used += 1
+            line_length = len(word)
+        else:
+            line_length += 1 + len(word)
+        current.append(word)
+        current_times.append((word, start, end))
+        cue_end = max(cue_end, end)
+    else:
+        if current:
+            cues.append({'start': cue_start, 'end': cue_end,
+                         'lines': wrap_lines(current, max_chars, max_lines),
+                         'words': current_times})
+
+    # Hold short cues for min_duration without running into the next one
+    for index, cue in enumerate(cues):
+        end = max(cue['end'], cue['start'] + min_duration)
+        if index + 1 < len(cues):
+            end = min(end, cues[index + 1]['start'])
+        cue['end'] = max(end, cue['start'])
+
+    if limit is not None:
+        del cues[limit:]
+    return cues
+
+
+def ass_time(seconds):
+    """H:MM:SS.cc as used by ASS/SSA"""
+    centis = max(int(round(seconds * 100)), 0)
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def iter_srt(cues, language=None):
+    for number, cue in enumerate(cues, start=1):
+        yield (f"{number}\n{format_time(cue['start'])} --> {format_time(cue['end'])}\n"
+               + "\n".join(cue['lines']) + "\n\n")
+
+
+def iter_vtt(cues, language=None):
+    yield "WEBVTT\n\n"
+    for number, cue in enumerate(cues, start=1):
+        # Cue text is markup: & and < must be escaped (and > so no line reads as "-->")
+        yield (f"{number}\n{format_time(cue['start'], '.')} --> {format_time(cue['end'], '.')}\n"
+               + "\n".join(escape(line) for line in cue['lines']) + "\n\n")
+
+
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1920
+PlayResY: 1080
+WrapStyle: 2
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,56,&H00FFFFFF,&H000000FF,&H00000000,&H64000000,0,0,0,0,100,100,0,0,1,3,1,2,60,60,50,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def ass_text(line):
+    # Braces open override blocks and backslashes start tags in ASS
+    return line.replace("\\", "\u29f5").replace("{", "\\{").replace("}", "\\}")
+
+
+def iter_ass(cues, language=None):
+    yield ASS_HEADER
+    for cue in cues:
+        text = "\\N".join(ass_text(line) for line in cue['lines'])
+        yield f"Dialogue: 0,{ass_time(cue['start'])},{ass_time(cue['end'])},Default,,0,0,0,,{text}\n"
+
+
+def iter_ttml(cues, language=None):
+    lang = LANGUAGE_TAGS.get(language, language or "und")
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           f'<tt xmlns="http://www.w3.org/ns/ttml" xml:lang={quoteattr(lang)}>\n'
+           '  <body>\n    <div>\n')
+    for cue in cues:
+        text = "<br/>".join(escape(line) for line in cue['lines'])
+        yield (f'      <p begin="{format_time(cue["start"], ".")}" '
+               f'end="{format_time(cue["end"], ".")}">{text}</p>\n')
+    yield "    </div>\n  </body>\n</tt>\n"
+
+
+def iter_json(cues, language=None):
+    """Cues with word-level timings, one cue object per chunk"""
+    yield '{"language": ' + json.dumps(LANGUAGE_TAGS.get(language, language)) + ', "cues": ['
+    for index, cue in enumerate(cues):
+        entry = {
+            'index': index + 1,
+            'start': round(cue['start'], 3),
+            'end': round(cue['end'], 3),
+            'text': " ".join(cue['lines']),
+            'lines': cue['lines'],
+            'words': [
+                {'word': word, 'start': round(start, 3), 'end': round(end, 3)}
+                for word, start, end in cue['words']
+            ]
+        }
+        yield ("," if index else "") + "\n  " + json.dumps(entry, ensure_ascii=False)
+    yield "\n]}\n"
+
+
+# name: (writer, file extension, MIME type)
+SUBTITLE_FORMATS = {
+    'srt': (iter_srt, "srt", "text/plain"),
+    'vtt': (iter_vtt, "vtt", "text/vtt"),
+    'ass': (iter_ass, "ass", "text/x-ssa"),
+    'ttml': (iter_ttml, "ttml", "application/ttml+xml"),
+    'json': (iter_json, "json", "application/json")
+}
+
+
+def write_subtitles(cues, format_name, output, language=None):
+    """Stream a cue timeline to a text file object in the given format"""
+    writer = SUBTITLE_FORMATS[format_name][0]
+    for chunk in writer(cues, language):
+        output.write(chunk)
+
+
+def render_subtitles(cues, format_name, language=None):
+    writer = SUBTITLE_FORMATS[format_name][0]
+    return "".join(writer(cues, language))
+
+
+def render_srt(cues):
+    return render_subtitles(cues, 'srt')
+
+
+def create_full_srt(text, timestamps, max_chars=42, max_lines=2, min_duration=0.0):
+    return render_srt(build_cues(text, timestamps, max_chars, max_lines, min_duration))
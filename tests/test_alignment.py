@@ -0,0 +1,59 @@
+from alignment import align_lines, align_tokens
+from line_editor import LineStore
+
+ORIGINAL = {
+    'tanglish': "naan veetuku poren. nee enga irukka. saapten",
+    'tamil': "நான் வீட்டுக்கு போறேன். நீ எங்க இருக்க. சாப்டேன்",
+    'english': "I am going home. Where are you. I ate",
+}
+
+
+def lines_of(*texts):
+    return list(enumerate(texts, start=1))
+
+
+def test_align_tokens_maps_around_insertions_and_deletions():
+    original = "a b c d e f".split()
+    edited = "a b x d e".split()
+    assert align_tokens(original, edited) == [0, 1, -1, 3, 4]
+
+
+def test_unchanged_lines_take_their_original_translation():
+    aligned = align_lines(ORIGINAL, lines_of("naan veetuku poren", "nee enga irukka", "saapten"))
+    assert [entry['stale'] for entry in aligned] == [False, False, False]
+    assert [entry['english'] for entry in aligned] == ["I am going home", "Where are you", "I ate"]
+
+
+def test_edited_line_is_stale_and_others_are_not():
+    aligned = align_lines(ORIGINAL, lines_of("naan veetuku poren", "nee enga da irukka", "saapten"))
+    assert [entry['stale'] for entry in aligned] == [False, True, False]
+    # Stale lines keep the text they overlap until re-translated
+    assert aligned[1]['tamil'] == "நீ எங்க இருக்க"
+
+
+def test_split_line_stays_up_to_date_without_duplicating_text():
+    aligned = align_lines(ORIGINAL, lines_of("naan veetuku", "poren", "nee enga irukka", "saapten"))
+    assert [entry['stale'] for entry in aligned] == [False, False, False, False]
+    assert [entry['english'] for entry in aligned] == ["I am going home", "", "Where are you", "I ate"]
+    assert aligned[0]['group'] == aligned[1]['group'] != aligned[2]['group']
+
+
+def test_merged_lines_take_both_translations():
+    aligned = align_lines(ORIGINAL, lines_of("naan veetuku poren nee enga irukka", "saapten"))
+    assert [entry['stale'] for entry in aligned] == [False, False]
+    assert aligned[0]['english'] == "I am going home Where are you"
+
+
+def test_segments_shared_by_lines_are_resent_together():
+    original = dict(ORIGINAL, segments=[
+        {'tanglish': "naan veetuku poren. nee enga irukka.", 'tamil': "நான் வீட்டுக்கு போறேன். நீ எங்க இருக்க.",
+         'english': "I am going home. Where are you?"},
+        {'tanglish': "saapten", 'tamil': "சாப்டேன்", 'english': "I ate"},
+    ])
+    store = LineStore(ORIGINAL['tanglish'])
+    store.seed_translations("", "")
+    assert store.apply_alignment(align_lines(original, store.items())) == []
+
+    store.set_line(store.ids[1], "nee enga da irukka")
+    assert store.apply_alignment(align_lines(original, store.items())) == [1, 2]
+    assert store.pending_ids() == store.ids[:2]
@@ -0,0 +1,46 @@
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    return now
+
+
+def test_reservations_past_the_budget_wait_in_order(clock):
+    limiter = RateLimiter("test", {'requests': 60})
+    waits = [limiter.reserve() for _ in range(64)]
+    # A full bucket lets exactly the first minute's budget through at once
+    assert waits[:60] == [0.0] * 60
+    # Each later caller is queued one request interval (1 s) behind the previous one
+    assert waits[60:] == pytest.approx([1.0, 2.0, 3.0, 4.0])
+
+
+def test_refill_shortens_the_queue(clock):
+    limiter = RateLimiter("test", {'requests': 60})
+    for _ in range(70):
+        limiter.reserve()
+    assert limiter.current_wait() == pytest.approx(11.0)
+    clock[0] += 4
+    assert limiter.current_wait() == pytest.approx(7.0)
+
+
+def test_units_budget_delays_the_next_caller(clock):
+    limiter = RateLimiter("test", {'requests': 1000, 'units': 600})
+    # A request larger than the budget waits for the excess to refill
+    assert limiter.reserve(900) == pytest.approx(30.0)
+    assert limiter.reserve(10) == pytest.approx(31.0)
+    assert limiter.reserve(10) == pytest.approx(32.0)
+
+
+def test_shared_state_orders_reservations_across_limiters(clock, tmp_path):
+    first = RateLimiter("test", {'requests': 60}, state_dir=str(tmp_path))
+    second = RateLimiter("test", {'requests': 60}, state_dir=str(tmp_path))
+    for _ in range(60):
+        first.reserve()
+    assert second.reserve() == pytest.approx(1.0)
+    assert first.reserve() == pytest.approx(2.0)
@@ -0,0 +1,47 @@
+from subtitles import build_cues, render_subtitles, wrap_lines
+
+
+def timings(*spans):
+    return [{'word': f"w{index}", 'start_time': start, 'end_time': end}
+            for index, (start, end) in enumerate(spans)]
+
+
+def test_min_duration_extends_short_cues():
+    cues = build_cues("vanakkam", timings((1.0, 1.2)), min_duration=2.0)
+    assert (cues[0]['start'], cues[0]['end']) == (1.0, 3.0)
+
+
+def test_min_duration_never_runs_into_the_next_cue():
+    # The pause splits the words into two cues
+    cues = build_cues("vanakkam nanba", timings((1.0, 1.2), (2.0, 2.3)), min_duration=2.0)
+    assert len(cues) == 2
+    assert cues[0]['end'] == 2.0
+    assert cues[1]['end'] == 4.0
+
+
+def test_wrap_lines_balances_two_lines():
+    words = "inru naam pudhiya thozhilnutpam patri pesalam".split()
+    first, second = wrap_lines(words, max_chars=30, max_lines=2)
+    assert abs(len(first) - len(second)) <= max(len(word) for word in words)
+    assert f"{first} {second}" == " ".join(words)
+
+
+def test_wrap_lines_keeps_short_or_single_line_cues_whole():
+    assert wrap_lines(["vanakkam", "nanba"], max_chars=42, max_lines=2) == ["vanakkam nanba"]
+    assert wrap_lines(["a"] * 30, max_chars=10, max_lines=1) == [" ".join(["a"] * 30)]
+
+
+def test_cue_lines_fit_max_chars():
+    words = ("indha system eppadi velai seigiradhu endru paarkalam " * 20).split()
+    spans = [(index * 0.3, index * 0.3 + 0.25) for index in range(len(words))]
+    cues = build_cues(" ".join(words), timings(*spans), max_chars=20, max_lines=2)
+    assert all(len(cue['lines']) <= 2 for cue in cues)
+    assert all(len(line) <= 20 for cue in cues for line in cue['lines'])
+    assert [word for cue in cues for word, _, _ in cue['words']] == words
+
+
+def test_vtt_escapes_cue_text():
+    cues = build_cues("Q&A <live> R&D", timings((0.0, 0.5), (0.5, 1.0), (1.0, 1.5)))
+    vtt = render_subtitles(cues, 'vtt')
+    assert "Q&amp;A &lt;live&gt; R&amp;D" in vtt
+    assert "<" not in vtt
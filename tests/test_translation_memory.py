@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+from translation_memory import TranslationMemory, normalize_sentence
+
+
+@pytest.mark.parametrize("first, second", [
+    ("அவன் கல் எடுத்தான்", "அவன் கலை எடுத்தான்"),
+    ("வணக்கம்", "வணகம"),
+    ("பால் குடி", "பல் குடி"),
+])
+def test_different_sentences_get_different_keys(first, second):
+    assert normalize_sentence(first) != normalize_sentence(second)
+
+
+def test_vowel_signs_and_pulli_are_kept():
+    assert normalize_sentence("வணக்கம்!") == "வணக்கம்"
+
+
+def test_punctuation_case_and_spacing_are_ignored():
+    assert normalize_sentence("  Idhu  oru Test, சரி?") == normalize_sentence("idhu oru test சரி")
+
+
+def test_lookup_returns_only_the_stored_sentence(tmp_path):
+    memory = TranslationMemory(str(tmp_path))
+    memory.store_many([("அவன் கல் எடுத்தான்", "avan kal eduthaan", "He took a stone")])
+    assert memory.lookup_many(["அவன் கலை எடுத்தான்"]) == {}
+    found = memory.lookup_many(["அவன் கல் எடுத்தான்."])
+    assert list(found.values()) == [{'tanglish': "avan kal eduthaan", 'english': "He took a stone"}]
+
+
+def test_memory_from_an_older_version_is_cleared(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "translation_memory.sqlite3"))
+    conn.execute("CREATE TABLE sentences (key TEXT PRIMARY KEY, tanglish TEXT NOT NULL, "
+                 "english TEXT NOT NULL, uses INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO sentences VALUES ('அவன கல எடுததான', 'x', 'y', 0, 0)")
+    conn.commit()
+    conn.close()
+    assert TranslationMemory(str(tmp_path)).size() == 0
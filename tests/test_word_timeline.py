@@ -0,0 +1,74 @@
+import json
+
+from word_timeline import WordTimeline, load_timeline
+
+
+def timings(*entries):
+    return [{'word': word, 'start_time': start, 'end_time': end} for word, start, end in entries]
+
+
+TIMESTAMPS = timings(("வணக்கம்", 0.0, 0.5), ("nanba", 0.5, 1.0), ("", 1.2, 1.4), ("inru", 2.0, 2.6))
+
+
+def test_encode_decode_round_trip():
+    timeline = WordTimeline.from_dicts(TIMESTAMPS)
+    decoded = WordTimeline.decode(json.loads(json.dumps(timeline.encode())))
+    assert list(decoded) == TIMESTAMPS
+    assert decoded.encode() == timeline.encode()
+
+
+def test_empty_timeline_round_trip():
+    decoded = WordTimeline.decode(WordTimeline.from_dicts([]).encode())
+    assert len(decoded) == 0
+    assert not decoded
+    assert decoded.index_at(1.0) == -1
+
+
+def test_times_are_stored_in_whole_milliseconds():
+    timeline = WordTimeline.from_dicts(timings(("a", 1.23449, 1.2346)))
+    assert (timeline.start_time(0), timeline.end_time(0)) == (1.234, 1.235)
+
+
+def test_newlines_inside_a_word_do_not_split_it():
+    decoded = WordTimeline.decode(WordTimeline.from_dicts(timings(("a\nb", 0.0, 1.0), ("c", 1.0, 2.0))).encode())
+    assert [entry['word'] for entry in decoded] == ["a b", "c"]
+
+
+def test_index_at_boundaries():
+    timeline = WordTimeline.from_dicts(TIMESTAMPS)
+    assert timeline.index_at(-0.1) == -1
+    assert timeline.index_at(0.0) == 0
+    assert timeline.index_at(0.499) == 0
+    assert timeline.index_at(0.5) == 1
+    # In a pause, the word that last started
+    assert timeline.index_at(1.8) == 2
+    assert timeline.index_at(99.0) == 3
+
+
+def test_slice_time_keeps_only_overlapping_words():
+    timeline = WordTimeline.from_dicts(TIMESTAMPS)
+
+    def words(start, end):
+        return [entry['word'] for entry in timeline.slice_time(start, end)]
+
+    assert words(0.0, 3.0) == ["வணக்கம்", "nanba", "", "inru"]
+    # A word ending exactly at the start, or starting exactly at the end, is left out
+    assert words(0.5, 1.2) == ["nanba"]
+    assert words(0.25, 0.75) == ["வணக்கம்", "nanba"]
+    assert words(1.5, 1.9) == []
+    assert words(5.0, 6.0) == []
+
+
+def test_slices_of_slices_keep_words_and_times():
+    timeline = WordTimeline.from_dicts(TIMESTAMPS)
+    inner = timeline[1:4][1:]
+    assert list(inner) == TIMESTAMPS[2:]
+    assert list(WordTimeline.decode(inner.encode())) == TIMESTAMPS[2:]
+
+
+def test_load_timeline_accepts_every_stored_form():
+    timeline = WordTimeline.from_dicts(TIMESTAMPS)
+    assert load_timeline(timeline) is timeline
+    assert list(load_timeline(timeline.encode())) == TIMESTAMPS
+    assert list(load_timeline(TIMESTAMPS)) == TIMESTAMPS
+    assert len(load_timeline(None)) == 0
@@ -0,0 +1,356 @@
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pydub import AudioSegment
+from pydub.silence import detect_silence
+
+from audio_processing import (
+    BYTES_PER_SECOND,
+    TRANSPORT_FORMATS,
+    choose_transport_format,
+    encode_for_transport,
+)
+from resilience import call_with_resilience
+
+WHISPER_MODEL = "whisper-1"
+
+# OpenAI rejects uploads above 25MB; keep chunks a little under it
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+CHUNK_MAX_BYTES = 24 * 1024 * 1024
+CHUNK_MAX_WORKERS = 4
+
+# Longest one Whisper request may take, including retries
+WHISPER_DEADLINE_SECONDS = 900
+
+# Silence search settings used when picking chunk boundaries
+SILENCE_SEARCH_MS = 30 * 1000
+SILENCE_MIN_LEN_MS = 400
+SILENCE_THRESH_OFFSET_DB = 16
+
+# Words per segment when Whisper returns no segment timings
+SEGMENT_MAX_WORDS = 12
+
+
+def transcribe_with_whisper(client, audio_content, language="ta", file_suffix=".wav", audio_seconds=None):
+    """
+    Transcribe audio using OpenAI Whisper API
+
+    Args:
+        client: Initialized OpenAI client
+        audio_content: Raw audio bytes
+        language: Language code (ta for Tamil, en for English)
+        file_suffix: Extension matching the audio encoding (.wav, .flac, .ogg)
+        audio_seconds: Audio length for the rate limiter; derived from WAV bytes if not given
+
+    Returns:
+        dict: Contains transcript and timestamps if available
+    """
+    try:
+        # Create a temporary file for the audio
+        with tempfile.NamedTemporaryFile(suffix=file_suffix, delete=False) as temp_file:
+            temp_file.write(audio_content)
+            temp_file_path = temp_file.name
+
+        try:
+            def request(timeout):
+                # Reopened per attempt so a retry uploads the whole file again
+                with open(temp_file_path, "rb") as audio_file:
+                    # Use Whisper API with timestamp feature
+                    return client.audio.transcriptions.create(
+                        model=WHISPER_MODEL,
+                        file=audio_file,
+                        language=language,
+                        response_format="verbose_json",
+                        timestamp_granularities=["word", "segment"],
+                        timeout=timeout
+                    )
+
+            # Retries 429/5xx with backoff and fails fast while Whisper is down
+            if audio_seconds is None:
+                audio_seconds = len(audio_content) / BYTES_PER_SECOND if file_suffix == ".wav" else 0
+            transcript_response = call_with_resilience(
+                request, 'whisper', WHISPER_DEADLINE_SECONDS, units=audio_seconds
+            )
+
+            # Extract transcript and word-level timestamps
+            full_transcript = transcript_response.text
+
+            # Generate word timestamps from segments if available
+            timestamps_data = []
+            if hasattr(transcript_response, 'words') and transcript_response.words:
+                for word_info in transcript_response.words:
+                    timestamps_data.append({
+                        'word': word_info.word,
+                        'start_time': word_info.start,
+                        'end_time': word_info.end
+                    })
+            else:
+                # Fallback: create estimated timestamps
+                words = full_transcript.split()
+                estimated_duration = len(words) * 0.5  # Rough estimate
+                for i, word in enumerate(words):
+                    start_time = i * (estimated_duration / len(words))
+                    end_time = (i + 1) * (estimated_duration / len(words))
+                    timestamps_data.append({
+                        'word': word,
+                        'start_time': start_time,
+                        'end_time': end_time
+                    })
+
+            # Sentence-level segments keep translations tied to timing
+            segments_data = []
+            if hasattr(transcript_response, 'segments') and transcript_response.segments:
+                for segment_info in transcript_response.segments:
+                    text = segment_info.text.strip()
+                    if text:
+                        segments_data.append({
+                            'id': len(segments_data),
+                            'text': text,
+                            'start_time': segment_info.start,
+                            'end_time': segment_info.end
+                        })
+            else:
+                segments_data = segments_from_words(timestamps_data)
+
+            return {
+                'transcript': full_transcript,
+                'timestamps': timestamps_data,
+                'segments': segments_data,
+                'success': True
+            }
+
+        finally:
+            # Clean up temporary file
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+
+    except Exception as e:
+        return {
+            'transcript': "",
+            'timestamps': [],
+            'success': False,
+            'error': str(e)
+        }
+
+
+def segments_from_words(timestamps_data, max_words=SEGMENT_MAX_WORDS):
+    """Group word timings into segments at sentence ends or every max_words words"""
+    segments_data = []
+    current = []
+
+    for word_info in timestamps_data:
+        current.append(word_info)
+        if len(current) >= max_words or word_info['word'].rstrip().endswith(('.', '?', '!')):
+            segments_data.append({
+                'id': len(segments_data),
+                'text': " ".join(w['word'].strip() for w in current),
+                'start_time': current[0]['start_time'],
+                'end_time': current[-1]['end_time']
+            })
+            current = []
+
+    if current:
+        segments_data.append({
+            'id': len(segments_data),
+            'text': " ".join(w['word'].strip() for w in current),
+            'start_time': current[0]['start_time'],
+            'end_time': current[-1]['end_time']
+        })
+    return segments_data
+
+
+def find_chunk_boundaries(audio_segment, max_chunk_ms):
+    """
+    Pick cut points (in ms) so that no chunk is longer than max_chunk_ms.
+
+    Each cut is placed in the middle of the last silence found in the
+    SILENCE_SEARCH_MS window before the limit, so words are not split.
+    Falls back to a hard cut when the window has no silence.
+    """
+    total_ms = len(audio_segment)
+    silence_thresh = audio_segment.dBFS - SILENCE_THRESH_OFFSET_DB
+    boundaries = [0]
+    start = 0
+
+    while total_ms - start > max_chunk_ms:
+        hard_end = start + max_chunk_ms
+        window_start = max(start + 1, hard_end - SILENCE_SEARCH_MS)
+
+        # Only scan the search window, not the whole file
+        silences = detect_silence(
+            audio_segment[window_start:hard_end],
+            min_silence_len=SILENCE_MIN_LEN_MS,
+            silence_thresh=silence_thresh
+        )
+        if silences:
+            silence_start, silence_end = silences[-1]
+            cut = window_start + (silence_start + silence_end) // 2
+        else:
+            cut = hard_end
+
+        boundaries.append(cut)
+        start = cut
+
+    boundaries.append(total_ms)
+    return boundaries
+
+
+def split_audio_on_silence(audio_content, max_bytes=CHUNK_MAX_BYTES):
+    """
+    Split processed WAV audio into chunks that each fit under max_bytes.
+
+    Returns:
+        list: (offset_seconds, wav_bytes) tuples in playback order
+    """
+    audio_segment = AudioSegment.from_file(io.BytesIO(audio_content), format="wav")
+    bytes_per_ms = audio_segment.frame_rate * audio_segment.frame_width / 1000
+
+    # Leave room for the WAV header
+    max_chunk_ms = int((max_bytes - 1024) / bytes_per_ms)
+    boundaries = find_chunk_boundaries(audio_segment, max_chunk_ms)
+
+    chunks = []
+    for start_ms, end_ms in zip(boundaries, boundaries[1:]):
+        buffer = io.BytesIO()
+        audio_segment[start_ms:end_ms].export(buffer, format="wav")
+        chunks.append((start_ms / 1000, buffer.getvalue()))
+    return chunks
+
+
+def merge_chunk_results(chunk_results):
+    """Join per-chunk Whisper results into one transcript and timeline"""
+    transcripts = []
+    timestamps_data = []
+    segments_data = []
+
+    for offset, result in chunk_results:
+        text = result['transcript'].strip()
+        if text:
+            transcripts.append(text)
+        for word_info in result['timestamps']:
+            timestamps_data.append({
+                'word': word_info['word'],
+                'start_time': word_info['start_time'] + offset,
+                'end_time': word_info['end_time'] + offset
+            })
+        # Segment ids are renumbered so they stay unique across chunks
+        for segment_info in result.get('segments', []):
+            segments_data.append({
+                'id': len(segments_data),
+                'text': segment_info['text'],
+                'start_time': segment_info['start_time'] + offset,
+                'end_time': segment_info['end_time'] + offset
+            })
+
+    return {
+        'transcript': " ".join(transcripts),
+        'timestamps': timestamps_data,
+        'segments': segments_data,
+        'success': True
+    }
+
+
+def transcribe_chunk(client, wav_chunk, language, transport):
+    """Encode one WAV chunk for upload and transcribe it"""
+    try:
+        encoded = encode_for_transport(wav_chunk, transport)
+    except Exception as e:
+        return {'transcript': "", 'timestamps': [], 'success': False, 'error': str(e)}
+    return transcribe_with_whisper(
+        client, encoded, language, TRANSPORT_FORMATS[transport]['suffix'],
+        audio_seconds=len(wav_chunk) / BYTES_PER_SECOND
+    )
+
+
+def transcribe_in_chunks(client, audio_content, language="ta", max_bytes=CHUNK_MAX_BYTES,
+                         max_workers=CHUNK_MAX_WORKERS, transport="wav", progress_callback=None):
+    """
+    Transcribe audio of any length by splitting it at silences and sending
+    the chunks to Whisper concurrently.
+
+    Args:
+        max_bytes: Largest WAV chunk to cut; scale it down for compressed transports
+        transport: Upload encoding applied to each chunk inside the worker
+        progress_callback: Optional fn(chunks_done, chunks_total), called from this thread
+
+    Returns:
+        dict: Same shape as transcribe_with_whisper, plus the chunk count
+    """
+    try:
+        chunks = split_audio_on_silence(audio_content, max_bytes)
+    except Exception as e:
+        return {
+            'transcript': "",
+            'timestamps': [],
+            'success': False,
+            'error': f"Could not split audio: {e}"
+        }
+
+    results = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(transcribe_chunk, client, chunk, language, transport): index
+            for index, (_, chunk) in enumerate(chunks)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(done, len(chunks))
+
+    for index, result in enumerate(results):
+        if not result['success']:
+            return {
+                'transcript': "",
+                'timestamps': [],
+                'success': False,
+                'error': f"Chunk {index + 1}/{len(chunks)} failed: {result.get('error', 'Unknown error')}"
+            }
+
+    merged = merge_chunk_results(
+        [(offset, result) for (offset, _), result in zip(chunks, results)]
+    )
+    merged['chunks'] = len(chunks)
+    return merged
+
+
+def transcribe_audio(client, audio_content, language="ta", max_workers=CHUNK_MAX_WORKERS,
+                     transport="auto", progress_callback=None):
+    """
+    Transcribe processed WAV audio, compressing it for upload first.
+
+    Sends one request when the encoded audio fits under Whisper's limit and
+    falls back to parallel chunks otherwise.
+
+    Args:
+        transport: "auto", or one of TRANSPORT_FORMATS to force an encoding
+        progress_callback: Optional fn(chunks_done, chunks_total)
+    """
+    duration_ms = max(len(audio_content) - 44, 0) / BYTES_PER_SECOND * 1000
+    transport = choose_transport_format(duration_ms, CHUNK_MAX_BYTES, transport)
+
+    try:
+        encoded = encode_for_transport(audio_content, transport)
+    except Exception as e:
+        return {'transcript': "", 'timestamps': [], 'success': False, 'error': str(e)}
+
+    if len(encoded) <= WHISPER_MAX_BYTES:
+        result = transcribe_with_whisper(
+            client, encoded, language, TRANSPORT_FORMATS[transport]['suffix'],
+            audio_seconds=len(audio_content) / BYTES_PER_SECOND
+        )
+    else:
+        # Size WAV chunks so each one still fits once encoded, with some headroom
+        ratio = len(encoded) / max(len(audio_content), 1)
+        result = transcribe_in_chunks(
+            client, audio_content, language,
+            max_bytes=int(CHUNK_MAX_BYTES * 0.9 / ratio),
+            max_workers=max_workers,
+            transport=transport,
+            progress_callback=progress_callback
+        )
+
+    result['transport'] = transport
+    result['upload_bytes'] = len(encoded)
+    return result
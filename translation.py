@@ -0,0 +1,504 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from resilience import GEMINI_HEDGE_SECONDS, call_with_resilience
+from translation_memory import normalize_sentence, split_sentences
+from transliteration import transliterate
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Upper bound for each Gemini call, retries included; both calls share this deadline
+TRANSLATION_TIMEOUT_SECONDS = 120
+
+# Segment mode: input tokens per batch and batches in flight at once
+SEGMENT_BATCH_TOKENS = 1500
+SEGMENT_MAX_CONCURRENCY = 4
+
+# Transcripts longer than this use segment mode when the mode is "auto"
+SEGMENT_MODE_MIN_CHARS = 4000
+
+# Enhanced prompt for better Tanglish accuracy
+TANGLISH_RULES = """        CRITICAL PHONETIC RULES:
+        - க = ka/ga, ச = cha/sa, ட = ta/da, த = tha, ப = pa/ba, ற = ra/rra
+        - ங் = ng, ன் = n, ம் = m, ல் = l, ர் = r, ய் = y, ழ் = zh
+        - ஆ = aa, ஈ = ee, ஊ = oo, ஏ = e, ஐ = ai, ஓ = o, ஔ = au
+        - Double consonants: க்க = kka, ச்ச = chcha, ட்ட = tta, ப்ப = ppa
+        
+        WORD ACCURACY FIXES:
+        - மிசைல் = missile (keep English technical terms)
+        - சிஸ்டம் = system 
+        - மெசேஜ் = message
+        - டெக்னாலஜி = technology
+        - இன்ஜினியர் = engineer
+        - கம்ப்யூட்டர் = computer
+        
+        COMMON WORDS - USE THESE EXACT SPELLINGS:
+        - என்ன = enna, அவன் = avan, இவன் = ivan, அது = adhu, இது = idhu
+        - நமக்கு = namaku, எங்களுக்கு = engaluku, உங்களுக்கு = ungaluku
+        - பண்ணலாம் = pannalam, செய்யலாம் = seiyalam
+        - இருக்கு = iruku, வருகிறேன் = varukiren
+        - கிட்ட = kitta, கூட = kooda, மட்டும் = mattum
+        
+        EXAMPLES OF CORRECT CONVERSION:
+        - நிச்சயமான = nichchayamana 
+        - நாடுகள் = naadugal
+        - தொழில்நுட்பம் = thozhilnutpam
+        - பொறுப்பு = poruppu
+        - நிறுவனம் = niruvanam
+        
+"""
+
+TANGLISH_PROMPT = """
+        Convert this Tamil text to highly accurate Thanglish (Tamil written in phonetic English letters) following these strict rules:
+
+""" + TANGLISH_RULES + """        Text: "{tamil_text}"
+
+        Return ONLY the accurate Thanglish translation with proper phonetic spelling.
+        """
+
+ENGLISH_PROMPT = """
+        Translate this Tamil text to natural, contextually accurate English with perfect grammar.
+
+        TRANSLATION GUIDELINES:
+        - Preserve the original meaning and conversational tone
+        - Use natural English expressions, not literal translations
+        - Maintain technical terms appropriately 
+        - Keep the conversational flow for spoken content
+        - For Tamil cultural references, use equivalent English expressions
+        - Ensure grammatical correctness and natural sentence structure
+
+        Text: "{tamil_text}"
+
+        Return ONLY the natural English translation with proper grammar.
+        """
+
+SEGMENT_PROMPT = """
+        Translate each numbered Tamil subtitle segment below into Thanglish (Tamil written in
+        phonetic English letters) and natural English. Keep every segment separate and do not
+        merge or split them.
+
+        THANGLISH RULES:
+""" + TANGLISH_RULES + """        ENGLISH: natural, conversational and grammatically correct, keeping technical terms.
+
+        Segments (JSON list of {{"id", "text"}}):
+        {segments_json}
+
+        Return ONLY JSON of the form
+        {{"segments": [{{"id": <id>, "tanglish": "...", "english": "..."}}]}}
+        with exactly one entry per input id.
+        """
+
+# Segment prompt for the local Thanglish backend, which only needs English from Gemini
+SEGMENT_ENGLISH_PROMPT = """
+        Translate each numbered Tamil subtitle segment below into natural English. Keep every
+        segment separate and do not merge or split them.
+
+        ENGLISH: natural, conversational and grammatically correct, keeping technical terms.
+
+        Segments (JSON list of {{"id", "text"}}):
+        {segments_json}
+
+        Return ONLY JSON of the form
+        {{"segments": [{{"id": <id>, "english": "..."}}]}}
+        with exactly one entry per input id.
+        """
+
+LINE_PROMPT = """
+        The numbered lines below are Thanglish (Tamil written in phonetic English letters) from
+        an edited transcript. Translate each line into Tamil script and natural English. The
+        "before" and "after" fields are neighbouring lines, given only as context; do not
+        translate them. Keep every line separate and do not merge or split them.
+
+        Lines (JSON list of {{"id", "text", "before", "after"}}):
+        {segments_json}
+
+        Return ONLY JSON of the form
+        {{"segments": [{{"id": <id>, "tamil": "...", "english": "..."}}]}}
+        with exactly one entry per input id.
+        """
+
+# Neighbouring lines sent with each edited line as context
+LINE_CONTEXT_LINES = 1
+
+
+def gemini_request_options(timeout):
+    """
+    Per-call options for generate_content. The SDK's own retry is turned off
+    so call_with_resilience alone decides attempts and keeps the deadline.
+    """
+    return {"timeout": timeout, "retry": None}
+
+
+def run_translation_call(generative_model, prompt, timeout):
+    """Run one Gemini prompt and return (text, seconds taken)"""
+    start = time.perf_counter()
+    response = call_with_resilience(
+        lambda remaining: generative_model.generate_content(
+            prompt, request_options=gemini_request_options(remaining)
+        ),
+        'gemini', timeout, hedge_after=GEMINI_HEDGE_SECONDS, units=estimate_tokens(prompt)
+    )
+    return response.text.strip(), time.perf_counter() - start
+
+
+def generate_initial_translations(generative_model, tamil_text, timeout=TRANSLATION_TIMEOUT_SECONDS,
+                                  tanglish_backend="gemini"):
+    """
+    Translate Tamil text to Thanglish and English with two concurrent Gemini calls.
+
+    A failed or timed-out call only affects its own language (left empty and
+    reported in 'errors'); the other result is still returned. With tanglish_backend="local" Thanglish comes
+    from the offline transliteration engine and only English uses Gemini.
+
+    Returns:
+        dict: tamil, tanglish and english text, plus per-call 'latency'
+              (seconds) and 'errors' (message per failed language)
+    """
+    prompts = {'english': ENGLISH_PROMPT.format(tamil_text=tamil_text)}
+    if tanglish_backend == "gemini":
+        prompts['tanglish'] = TANGLISH_PROMPT.format(tamil_text=tamil_text)
+
+    # Not used as a context manager: exiting would wait on a hung call
+    executor = ThreadPoolExecutor(max_workers=len(prompts))
+    futures = {
+        name: executor.submit(run_translation_call, generative_model, prompt, timeout)
+        for name, prompt in prompts.items()
+    }
+
+    results = {'tamil': tamil_text}
+    latency = {}
+    errors = {}
+    deadline = time.monotonic() + timeout
+
+    if tanglish_backend == "local":
+        start = time.perf_counter()
+        results['tanglish'] = transliterate(tamil_text)
+        latency['tanglish'] = time.perf_counter() - start
+
+    for name, future in futures.items():
+        try:
+            text, elapsed = future.result(timeout=max(deadline - time.monotonic(), 0))
+            results[name] = text
+            latency[name] = elapsed
+        except FutureTimeoutError:
+            errors[name] = f"timed out after {timeout}s"
+            latency[name] = timeout
+        except Exception as e:
+            errors[name] = str(e)
+
+        if name in errors:
+            # Left empty rather than filled with the error message, which
+            # would otherwise end up in the editor, exports and cache
+            results[name] = ""
+
+    executor.shutdown(wait=False)
+
+    results['latency'] = latency
+    results['errors'] = errors
+    return results
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count; Tamil script averages about two characters per token"""
+    return len(text) // 2 + 1
+
+
+def batch_segments(segments_data, token_budget=SEGMENT_BATCH_TOKENS):
+    """Group consecutive segments into batches whose text fits the token budget"""
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for segment in segments_data:
+        tokens = estimate_tokens(segment['text'])
+        if current and current_tokens + tokens > token_budget:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(segment)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_segment_batch(generative_model, batch, timeout, prompt_template=SEGMENT_PROMPT):
+    """Translate one batch and return ({id: entry}, seconds taken)"""
+    segments_json = json.dumps(
+        [
+            {key: segment[key] for key in ('id', 'text', 'before', 'after') if key in segment}
+            for segment in batch
+        ],
+        ensure_ascii=False
+    )
+    prompt = prompt_template.format(segments_json=segments_json)
+    start = time.perf_counter()
+    response = call_with_resilience(
+        lambda remaining: generative_model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"},
+            request_options=gemini_request_options(remaining)
+        ),
+        'gemini', timeout, hedge_after=GEMINI_HEDGE_SECONDS, units=estimate_tokens(prompt)
+    )
+    parsed = json.loads(response.text)
+    entries = {}
+    for entry in parsed.get('segments', []):
+        # The model sometimes returns ids as strings or drops them; skip what can't be matched
+        try:
+            segment_id = int(entry.get('id', -1))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if segment_id >= 0:
+            entries[segment_id] = entry
+    return entries, time.perf_counter() - start
+
+
+def translate_segments(generative_model, segments_data, token_budget=SEGMENT_BATCH_TOKENS,
+                       max_concurrency=SEGMENT_MAX_CONCURRENCY, timeout=TRANSLATION_TIMEOUT_SECONDS,
+                       progress_callback=None, english_only=False):
+    """
+    Translate Whisper segments in token-budgeted batches that run in parallel.
+
+    Every translated line keeps its segment's start and end time. Segments
+    whose batch fails, or which the model leaves out, are marked as errors.
+    progress_callback, if given, is called with (batches_done, batches_total).
+    With english_only, Gemini is asked for English alone and 'tanglish' is
+    left empty for the local transliteration to fill.
+
+    Returns:
+        dict: Same shape as generate_initial_translations, plus 'segments'
+              with tamil/tanglish/english text and timing per segment
+    """
+    batches = batch_segments(segments_data, token_budget)
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    futures = [
+        executor.submit(
+            translate_segment_batch, generative_model, batch, timeout,
+            SEGMENT_ENGLISH_PROMPT if english_only else SEGMENT_PROMPT
+        )
+        for batch in batches
+    ]
+
+    translated = []
+    latency = {}
+    errors = {}
+    # Batches queue behind the concurrency cap, so allow one timeout per wave
+    waves = -(-len(batches) // max_concurrency)
+    deadline = time.monotonic() + timeout * max(waves, 1)
+
+    # Results are collected in submission order, so segments stay in order
+    for index, (batch, future) in enumerate(zip(batches, futures)):
+        name = f"batch {index + 1}"
+        try:
+            entries, elapsed = future.result(timeout=max(deadline - time.monotonic(), 0))
+            latency[name] = elapsed
+        except FutureTimeoutError:
+            entries = {}
+            errors[name] = f"timed out after {timeout}s"
+        except Exception as e:
+            entries = {}
+            errors[name] = str(e)
+
+        for segment in batch:
+            entry = entries.get(segment['id'])
+            if entry is None and name not in errors:
+                errors[f"segment {segment['id']}"] = "missing from model output"
+            translated.append({
+                'id': segment['id'],
+                'start_time': segment['start_time'],
+                'end_time': segment['end_time'],
+                'tamil': segment['text'],
+                'tanglish': (entry or {}).get('tanglish', "").strip(),
+                'english': (entry or {}).get('english', "").strip()
+            })
+
+        if progress_callback:
+            progress_callback(index + 1, len(batches))
+
+    executor.shutdown(wait=False)
+
+    return {
+        'tamil': " ".join(segment['tamil'] for segment in translated),
+        'tanglish': " ".join(segment['tanglish'] for segment in translated if segment['tanglish']),
+        'english': " ".join(segment['english'] for segment in translated if segment['english']),
+        'segments': translated,
+        'latency': latency,
+        'errors': errors
+    }
+
+
+def retranslate_lines(generative_model, lines, line_ids, context_lines=LINE_CONTEXT_LINES,
+                      token_budget=SEGMENT_BATCH_TOKENS, max_concurrency=SEGMENT_MAX_CONCURRENCY,
+                      timeout=TRANSLATION_TIMEOUT_SECONDS):
+    """
+    Translate only the given Thanglish lines to Tamil and English.
+
+    Each line goes with its neighbours as context, in token-budgeted
+    batches that run in parallel. Lines whose batch fails, or which the
+    model leaves out or returns empty, are reported in 'errors' and left
+    out of 'lines'.
+
+    Args:
+        lines: (id, text) for every line of the transcript, in order
+        line_ids: Ids of the lines to translate
+
+    Returns:
+        dict: 'lines' ({id: {'tamil', 'english'}}), 'latency' and 'errors'
+    """
+    wanted = set(line_ids)
+    requests = []
+    for index, (line_id, text) in enumerate(lines):
+        if line_id in wanted:
+            before = lines[max(index - context_lines, 0):index]
+            after = lines[index + 1:index + 1 + context_lines]
+            requests.append({
+                'id': line_id,
+                'text': text,
+                'before': ". ".join(line for _, line in before),
+                'after': ". ".join(line for _, line in after)
+            })
+
+    batches = batch_segments(requests, token_budget)
+    executor = ThreadPoolExecutor(max_workers=max(min(max_concurrency, len(batches)), 1))
+    futures = [
+        executor.submit(translate_segment_batch, generative_model, batch, timeout, LINE_PROMPT)
+        for batch in batches
+    ]
+
+    translated = {}
+    latency = {}
+    errors = {}
+    waves = -(-len(batches) // max_concurrency)
+    deadline = time.monotonic() + timeout * max(waves, 1)
+
+    for index, (batch, future) in enumerate(zip(batches, futures)):
+        name = f"batch {index + 1}"
+        try:
+            entries, elapsed = future.result(timeout=max(deadline - time.monotonic(), 0))
+            latency[name] = elapsed
+        except FutureTimeoutError:
+            errors[name] = f"timed out after {timeout}s"
+            continue
+        except Exception as e:
+            errors[name] = str(e)
+            continue
+
+        for request in batch:
+            entry = entries.get(request['id']) or {}
+            tamil = entry.get('tamil', "").strip()
+            english = entry.get('english', "").strip()
+            if tamil and english:
+                translated[request['id']] = {'tamil': tamil, 'english': english}
+            else:
+                errors[f"line {request['id']}"] = "missing from model output"
+
+    executor.shutdown(wait=False)
+
+    return {'lines': translated, 'latency': latency, 'errors': errors}
+
+
+def choose_translation_mode(tamil_text, segments_data, preference="auto"):
+    """Resolve "auto"/"full"/"segments"; segment mode needs segment timings"""
+    if not segments_data:
+        return "full"
+    if preference == "auto":
+        return "segments" if len(tamil_text) >= SEGMENT_MODE_MIN_CHARS else "full"
+    return preference
+
+
+def sentence_segments(tamil_text):
+    """Untimed segments, one per sentence, for translating whole transcripts by sentence"""
+    return [
+        {'id': index, 'text': sentence, 'start_time': None, 'end_time': None}
+        for index, sentence in enumerate(split_sentences(tamil_text))
+    ]
+
+
+def translate_with_memory(generative_model, memory, segments_data, english_only=False, **batch_options):
+    """
+    Translate segments, reusing translation memory and sending only misses to Gemini.
+
+    Repeated sentences within the job are also sent once. New translations
+    are written back to memory. With english_only (local Thanglish backend)
+    entries without Gemini Thanglish count as hits, and misses are sent
+    for English alone and stored without Thanglish.
+
+    Returns:
+        dict: Same shape as translate_segments, plus 'memory' with hits,
+              misses, hit_rate and an estimate of tokens_saved
+    """
+    keys = [normalize_sentence(segment['text']) for segment in segments_data]
+    known = memory.lookup_many((segment['text'] for segment in segments_data), need_tanglish=not english_only)
+
+    # One request entry per distinct unknown sentence
+    pending = {}
+    for key, segment in zip(keys, segments_data):
+        if key not in known and key not in pending:
+            pending[key] = segment
+
+    if pending:
+        fresh = translate_segments(
+            generative_model, list(pending.values()), english_only=english_only, **batch_options
+        )
+    else:
+        fresh = {'segments': [], 'latency': {}, 'errors': {}}
+
+    fresh_by_key = {}
+    for key, translated in zip(pending, fresh['segments']):
+        if translated['english'] and (translated['tanglish'] or english_only):
+            fresh_by_key[key] = translated
+    memory.store_many(
+        (translated['tamil'], translated['tanglish'], translated['english'])
+        for translated in fresh_by_key.values()
+    )
+
+    translated_segments = []
+    hits = 0
+    tokens_saved = 0
+    for key, segment in zip(keys, segments_data):
+        entry = known.get(key)
+        if entry:
+            hits += 1
+            tokens_saved += (estimate_tokens(segment['text']) + estimate_tokens(entry['tanglish'])
+                             + estimate_tokens(entry['english']))
+        else:
+            entry = fresh_by_key.get(key, {'tanglish': "", 'english': ""})
+        translated_segments.append({
+            'id': segment['id'],
+            'start_time': segment['start_time'],
+            'end_time': segment['end_time'],
+            'tamil': segment['text'],
+            'tanglish': entry['tanglish'],
+            'english': entry['english']
+        })
+
+    total = len(segments_data)
+    return {
+        'tamil': " ".join(segment['tamil'] for segment in translated_segments),
+        'tanglish': " ".join(s['tanglish'] for s in translated_segments if s['tanglish']),
+        'english': " ".join(s['english'] for s in translated_segments if s['english']),
+        'segments': translated_segments,
+        'latency': fresh['latency'],
+        'errors': fresh['errors'],
+        'memory': {
+            'hits': hits,
+            'misses': total - hits,
+            'hit_rate': hits / total if total else 0.0,
+            'tokens_saved': tokens_saved
+        }
+    }
+
+
+def apply_local_tanglish(translations):
+    """Replace Thanglish in segment results with the offline transliteration"""
+    for segment in translations['segments']:
+        segment['tanglish'] = transliterate(segment['tamil'])
+    translations['tanglish'] = " ".join(
+        segment['tanglish'] for segment in translations['segments'] if segment['tanglish']
+    )
+    return translations
@@ -0,0 +1,109 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from result_cache import DEFAULT_CACHE_DIR
+
+# Bump when normalize_sentence changes; older memories are cleared on open
+MEMORY_VERSION = 2
+
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def split_sentences(text):
+    """Split transcript text into sentences on ., ?, ! and the danda"""
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+
+def normalize_sentence(text):
+    """
+    Canonical form used as the memory key: NFC, no punctuation or symbols,
+    single spaces, case-folded (for English words mixed into Tamil). Tamil
+    vowel signs and the pulli are combining marks and must be kept.
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = "".join(" " if unicodedata.category(char)[0] in "PS" else char for char in text)
+    return WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class TranslationMemory:
+    """
+    Persistent Tamil sentence -> Thanglish/English store shared across files.
+
+    Only successful machine translations are stored, so repeated intros,
+    outros and sponsor reads are translated once.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "translation_memory.sqlite3")
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # Keys from an older normalize_sentence would give wrong hits
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != MEMORY_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS sentences")
+                self.conn.execute(f"PRAGMA user_version = {MEMORY_VERSION}")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sentences (
+                    key TEXT PRIMARY KEY,
+                    tanglish TEXT NOT NULL,
+                    english TEXT NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def lookup_many(self, sentences, need_tanglish=True):
+        """
+        Return {normalized key: {'tanglish', 'english'}} for sentences already
+        known. English-only entries (from the local Thanglish backend) count
+        only when need_tanglish is False.
+        """
+        keys = list({normalize_sentence(sentence) for sentence in sentences} - {""})
+        found = {}
+
+        with self.lock, self.conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT key, tanglish, english FROM sentences WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, tanglish, english in rows:
+                    if tanglish or not need_tanglish:
+                        found[key] = {'tanglish': tanglish, 'english': english}
+
+            if found:
+                self.conn.executemany(
+                    "UPDATE sentences SET uses = uses + 1 WHERE key = ?",
+                    [(key,) for key in found]
+                )
+        return found
+
+    def store_many(self, entries):
+        """Save (tamil, tanglish, english) tuples; tanglish may be empty"""
+        now = time.time()
+        rows = [
+            (normalize_sentence(tamil), tanglish, english, now)
+            for tamil, tanglish, english in entries
+            if normalize_sentence(tamil) and english
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sentences (key, tanglish, english, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def size(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sentences").fetchone()[0]
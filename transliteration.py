@@ -0,0 +1,193 @@
+"""
+Local Tamil -> Thanglish transliteration.
+
+Applies the same phonetic rules and fixed spellings as the Gemini Thanglish
+prompt (see TANGLISH_RULES in translation.py) without a network call. Text
+is split into grapheme clusters (consonant + vowel sign or pulli). Each word
+first tries the longest exception-dictionary prefix, then renders the
+remaining clusters with context-sensitive consonant rules (voicing between
+vowels and after nasals, doubled consonants).
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+PULLI = "்"
+
+CONSONANTS = {
+    'க': 'k', 'ங': 'ng', 'ச': 'ch', 'ஜ': 'j', 'ஞ': 'nj', 'ட': 't', 'ண': 'n',
+    'த': 'th', 'ந': 'n', 'ன': 'n', 'ப': 'p', 'ம': 'm', 'ய': 'y', 'ர': 'r',
+    'ற': 'r', 'ல': 'l', 'ள': 'l', 'ழ': 'zh', 'வ': 'v', 'ஶ': 'sh', 'ஷ': 'sh',
+    'ஸ': 's', 'ஹ': 'h'
+}
+
+VOWELS = {
+    'அ': 'a', 'ஆ': 'aa', 'இ': 'i', 'ஈ': 'ee', 'உ': 'u', 'ஊ': 'oo', 'எ': 'e',
+    'ஏ': 'e', 'ஐ': 'ai', 'ஒ': 'o', 'ஓ': 'o', 'ஔ': 'au', 'ஃ': 'h'
+}
+
+VOWEL_SIGNS = {
+    'ா': 'aa', 'ி': 'i', 'ீ': 'ee', 'ு': 'u', 'ூ': 'oo', 'ெ': 'e', 'ே': 'e',
+    'ை': 'ai', 'ொ': 'o', 'ோ': 'o', 'ௌ': 'au', PULLI: ''
+}
+
+# Stops change sound with position: க = ka/ga, ச = cha/sa, ட = ta/da, ப = pa/ba
+STOPS_INITIAL = {'க': 'k', 'ச': 's', 'ட': 't', 'த': 'th', 'ப': 'p'}
+STOPS_BETWEEN_VOWELS = {'க': 'g', 'ச': 's', 'ட': 'd', 'த': 'dh', 'ப': 'b'}
+STOPS_AFTER_NASAL = {'க': 'g', 'ச': 'j', 'ட': 'd', 'த': 'dh', 'ப': 'b'}
+STOPS_PLAIN = {'க': 'k', 'ச': 'ch', 'ட': 't', 'த': 'th', 'ப': 'p'}
+NASALS = {'ங', 'ஞ', 'ண', 'ந', 'ம', 'ன'}
+LIQUIDS = {'ய', 'ர', 'ல', 'ள', 'ழ'}
+
+# Fixed spellings from the Thanglish prompt; matched as the longest word prefix
+EXCEPTIONS = {
+    # Technical terms stay in English
+    'மிசைல்': 'missile',
+    'சிஸ்டம்': 'system',
+    'மெசேஜ்': 'message',
+    'டெக்னாலஜி': 'technology',
+    'இன்ஜினியர்': 'engineer',
+    'கம்ப்யூட்டர்': 'computer',
+    # Common words
+    'என்ன': 'enna',
+    'அவன்': 'avan',
+    'இவன்': 'ivan',
+    'அது': 'adhu',
+    'இது': 'idhu',
+    'நமக்கு': 'namaku',
+    'எங்களுக்கு': 'engaluku',
+    'உங்களுக்கு': 'ungaluku',
+    'பண்ணலாம்': 'pannalam',
+    'செய்யலாம்': 'seiyalam',
+    'இருக்கு': 'iruku',
+    'வருகிறேன்': 'varukiren',
+    'கிட்ட': 'kitta',
+    'கூட': 'kooda',
+    'மட்டும்': 'mattum',
+    # Worked examples
+    'நிச்சயமான': 'nichchayamana',
+    'நாடுகள்': 'naadugal',
+    'தொழில்நுட்பம்': 'thozhilnutpam',
+    'பொறுப்பு': 'poruppu',
+    'நிறுவனம்': 'niruvanam'
+}
+
+TAMIL_WORD = re.compile(r"[஀-௿]+")
+
+
+def split_clusters(word):
+    """Split a Tamil word into grapheme clusters: (letter, vowel sign or '')"""
+    clusters = []
+    for char in word:
+        if char in VOWEL_SIGNS and clusters and clusters[-1][0] in CONSONANTS and not clusters[-1][1]:
+            clusters[-1] = (clusters[-1][0], char)
+        else:
+            clusters.append((char, ''))
+    return clusters
+
+
+def build_exception_trie(exceptions):
+    """Trie over grapheme clusters; a node's None key holds the output for a full match"""
+    trie = {}
+    for tamil, thanglish in exceptions.items():
+        node = trie
+        for cluster in split_clusters(unicodedata.normalize("NFC", tamil)):
+            node = node.setdefault(cluster, {})
+        node[None] = thanglish
+    return trie
+
+
+EXCEPTION_TRIE = build_exception_trie(EXCEPTIONS)
+
+
+def longest_exception(clusters):
+    """Return (clusters matched, output) for the longest exception prefix, or (0, None)"""
+    node = EXCEPTION_TRIE
+    best = (0, None)
+    for index, cluster in enumerate(clusters):
+        node = node.get(cluster)
+        if node is None:
+            break
+        if None in node:
+            best = (index + 1, node[None])
+    return best
+
+
+def ends_in_vowel(cluster):
+    letter, sign = cluster
+    if letter in VOWELS:
+        return letter != 'ஃ'
+    return letter in CONSONANTS and sign != PULLI
+
+
+def render_consonant(clusters, index):
+    letter, sign = clusters[index]
+    prev = clusters[index - 1] if index > 0 else None
+    nxt = clusters[index + 1] if index + 1 < len(clusters) else None
+
+    if letter in STOPS_PLAIN:
+        if prev is None:
+            return STOPS_INITIAL[letter]
+        if prev == (letter, PULLI):
+            # Second half of a doubled consonant: க்க = kka, ச்ச = chcha
+            return STOPS_PLAIN[letter]
+        if prev[1] == PULLI and prev[0] in NASALS:
+            return STOPS_AFTER_NASAL[letter]
+        if prev[1] == PULLI and prev[0] in LIQUIDS and sign != PULLI:
+            # Voiced after r/l/zh too: நண்பர்கள் = nanbargal
+            return STOPS_BETWEEN_VOWELS[letter]
+        if ends_in_vowel(prev) and sign != PULLI:
+            return STOPS_BETWEEN_VOWELS[letter]
+        return STOPS_PLAIN[letter]
+
+    if letter == 'ற':
+        if prev == ('ன', PULLI):
+            return 'dr'
+        if sign == PULLI and nxt and nxt[0] == 'ற':
+            return 't'
+        return 'r'
+
+    # ய் after a vowel is a diphthong: செய் = sei, நாய் = naai
+    if letter == 'ய' and sign == PULLI and prev and ends_in_vowel(prev):
+        return 'i'
+
+    # Nasal before its own stop is a plain n: ங்க = ng, ஞ்ச = nj
+    if sign == PULLI and nxt:
+        if letter == 'ங' and nxt[0] == 'க':
+            return 'n'
+        if letter == 'ஞ' and nxt[0] in ('ச', 'ஜ'):
+            return 'n'
+
+    return CONSONANTS[letter]
+
+
+def render_clusters(clusters, start=0):
+    """Render clusters[start:], using the clusters before start as context"""
+    parts = []
+    for index in range(start, len(clusters)):
+        letter, sign = clusters[index]
+        if letter in CONSONANTS:
+            parts.append(render_consonant(clusters, index))
+            parts.append(VOWEL_SIGNS[sign] if sign else 'a')
+        elif letter in VOWELS:
+            parts.append(VOWELS[letter])
+        elif letter not in VOWEL_SIGNS:
+            # Tamil digits and symbols pass through unchanged
+            parts.append(letter)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=65536)
+def transliterate_word(word):
+    clusters = split_clusters(word)
+    matched, prefix = longest_exception(clusters)
+    if matched:
+        # The prefix's last cluster still decides voicing: என்னது = ennadhu
+        return prefix + render_clusters(clusters, matched)
+    return render_clusters(clusters)
+
+
+def transliterate(text):
+    """Transliterate Tamil script in text to Thanglish, leaving other characters as-is"""
+    text = unicodedata.normalize("NFC", text)
+    return TAMIL_WORD.sub(lambda match: transliterate_word(match.group(0)), text)
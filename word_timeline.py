@@ -0,0 +1,150 @@
+"""
+Compact word timeline for Whisper word timings.
+
+Words are kept in one newline-joined string with an offset table, and
+start/end times as int32 millisecond arrays, instead of one dict per word.
+An hour of speech (~9,000 words) takes roughly 150 KB this way, against
+several MB as a list of dicts, and encodes to a small JSON-safe dict for the
+result cache and job store.
+"""
+import base64
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+# Bump if the encoded layout changes
+TIMELINE_FORMAT = 1
+
+
+def pack_ints(values):
+    """Little-endian base64 of an int32 array"""
+    if sys.byteorder == "big":
+        values = array('i', values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def unpack_ints(encoded):
+    values = array('i')
+    values.frombytes(base64.b64decode(encoded))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class WordTimeline:
+    """
+    Word strings plus parallel start/end times in milliseconds.
+
+    Indexing and iteration still yield {'word', 'start_time', 'end_time'}
+    dicts (times in seconds), so code written for the list-of-dicts form
+    keeps working.
+    """
+
+    def __init__(self, text="", offsets=None, start_ms=None, end_ms=None):
+        self.text = text
+        # offsets[i]:offsets[i + 1] - 1 is word i in text
+        self.offsets = offsets if offsets is not None else array('i', [0])
+        self.start_ms = start_ms if start_ms is not None else array('i')
+        self.end_ms = end_ms if end_ms is not None else array('i')
+
+    @classmethod
+    def from_dicts(cls, timestamps):
+        words = []
+        offsets = array('i', [0])
+        start_ms = array('i')
+        end_ms = array('i')
+        position = 0
+        for timing in timestamps:
+            # Newlines separate words in the table, so they can't appear in one
+            word = timing.get('word', "").strip().replace("\n", " ")
+            words.append(word)
+            position += len(word) + 1
+            offsets.append(position)
+            start_ms.append(int(round(timing.get('start_time', 0) * 1000)))
+            end_ms.append(int(round(timing.get('end_time', 0) * 1000)))
+        text = "\n".join(words) + ("\n" if words else "")
+        return cls(text, offsets, start_ms, end_ms)
+
+    def __len__(self):
+        return len(self.start_ms)
+
+    def __bool__(self):
+        return len(self.start_ms) > 0
+
+    def word(self, index):
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def start_time(self, index):
+        return self.start_ms[index] / 1000
+
+    def end_time(self, index):
+        return self.end_ms[index] / 1000
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("WordTimeline slices must be contiguous")
+            return self.slice_index(start, stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return {
+            'word': self.word(index),
+            'start_time': self.start_time(index),
+            'end_time': self.end_time(index)
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def index_at(self, seconds):
+        """Index of the word being spoken at (or last started before) a time; -1 before the first"""
+        return bisect_right(self.start_ms, int(round(seconds * 1000))) - 1
+
+    def slice_index(self, start, stop):
+        base = self.offsets[start]
+        return WordTimeline(
+            self.text[base:self.offsets[stop]],
+            array('i', (offset - base for offset in self.offsets[start:stop + 1])),
+            self.start_ms[start:stop],
+            self.end_ms[start:stop]
+        )
+
+    def slice_time(self, start_seconds, end_seconds):
+        """Words that overlap [start_seconds, end_seconds)"""
+        end = bisect_right(self.start_ms, int(round(end_seconds * 1000)) - 1)
+        start = max(self.index_at(start_seconds), 0)
+        # The word at the start time may already have ended
+        if start < end and self.end_ms[start] <= int(round(start_seconds * 1000)):
+            start += 1
+        return self.slice_index(start, max(start, end))
+
+    def encode(self):
+        """JSON-safe dict for caches and job results"""
+        return {
+            'format': TIMELINE_FORMAT,
+            'words': self.text,
+            'start_ms': pack_ints(self.start_ms),
+            'end_ms': pack_ints(self.end_ms)
+        }
+
+    @classmethod
+    def decode(cls, encoded):
+        text = encoded['words']
+        offsets = array('i', [0])
+        offsets.extend(accumulate(len(word) + 1 for word in text.split("\n")[:-1]))
+        return cls(text, offsets, unpack_ints(encoded['start_ms']), unpack_ints(encoded['end_ms']))
+
+
+def load_timeline(value):
+    """WordTimeline from an encoded dict, a legacy list of dicts, or a timeline"""
+    if isinstance(value, WordTimeline):
+        return value
+    if isinstance(value, dict) and 'start_ms' in value:
+        return WordTimeline.decode(value)
+    return WordTimeline.from_dicts(value or [])